@@ -1,4 +1,154 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.core.paginator import Paginator
+from django.db import OperationalError, connection
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+
+from . import bulk
 from .models import Bookmark
-# Register your models here.
-admin.site.register(Bookmark)
\ No newline at end of file
+
+# 필터가 걸린 목록의 COUNT는 이 개수까지만 셈
+ADMIN_COUNT_CAP = 10000
+
+
+def estimate_row_count(model):
+    """
+    테이블 전체 행 수 추정 (COUNT(*) 없이)
+
+    - SQLite: ANALYZE 통계(sqlite_stat1), 없으면 MAX(id)
+    - PostgreSQL: pg_class.reltuples
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+            row = cursor.fetchone()
+            if row and row[0] > 0:
+                return row[0]
+        elif connection.vendor == 'sqlite':
+            try:
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+                row = cursor.fetchone()
+                if row:
+                    return int(row[0].split()[0])
+            except OperationalError:
+                # ANALYZE를 한 번도 안 했으면 sqlite_stat1 테이블이 없음
+                pass
+        cursor.execute(
+            f'SELECT MAX({connection.ops.quote_name(model._meta.pk.column)}) '
+            f'FROM {connection.ops.quote_name(table)}'
+        )
+        row = cursor.fetchone()
+        return (row[0] or 0) if row else 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    - 필터 없는 전체 목록: 통계 기반 추정치
+    - 필터가 있는 목록: ADMIN_COUNT_CAP개까지만 셈 (그 뒤는 keyset으로 이동)
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            return estimate_row_count(queryset.model)
+        return queryset.order_by()[:ADMIN_COUNT_CAP].count()
+
+
+class IsPublicFilter(admin.SimpleListFilter):
+    """공개 여부 필터 ((is_public, id) 인덱스 사용)"""
+    title = '공개 여부'
+    parameter_name = 'is_public'
+
+    def lookups(self, request, model_admin):
+        return [('1', '공개'), ('0', '비공개')]
+
+    def queryset(self, request, queryset):
+        if self.value() in ('0', '1'):
+            return queryset.filter(is_public=self.value() == '1')
+        return queryset
+
+
+@admin.register(Bookmark)
+class BookmarkAdmin(admin.ModelAdmin):
+    """
+    큰 테이블에서도 빠른 북마크 관리자 화면
+
+    실무 팁:
+    - 전체 COUNT(*) 대신 추정치 (show_full_result_count도 끔)
+    - owner를 행마다 조회하지 않도록 list_select_related
+    - 필터는 인덱스가 있는 is_public, owner만
+      (owner는 드롭다운 대신 사용자명 정확히 일치 검색: =owner__username)
+    - 정렬은 id 역순 → '다음' 링크는 OFFSET 대신 id__lt (keyset)
+    - 일괄 공개/비공개/삭제는 집합 쿼리 (bookmarks/bulk.py)
+    """
+    list_display = ('id', 'title', 'owner', 'is_public', 'created_at')
+    list_display_links = ('id', 'title')
+    list_select_related = ('owner',)
+    list_filter = (IsPublicFilter,)
+    search_fields = ('=owner__username',)
+    search_help_text = '사용자명(정확히 일치)으로 검색'
+    ordering = ('-id',)
+    sortable_by = ()
+    list_per_page = 100
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    raw_id_fields = ('owner', 'collection')
+    readonly_fields = ('created_at', 'updated_at')
+    change_list_template = 'admin/bookmarks/bookmark/change_list.html'
+    actions = ['make_public', 'make_private', 'delete_bookmarks']
+
+    def get_actions(self, request):
+        # 기본 삭제 액션은 객체를 전부 불러와서 하나씩 지움 → 대신 delete_bookmarks
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        cl = getattr(response, 'context_data', {}).get('cl')
+        if cl is not None:
+            results = list(cl.result_list)
+            if len(results) == cl.list_per_page:
+                # 이 페이지의 마지막 id보다 작은 것부터 → 인덱스로 바로 이동
+                response.context_data['keyset_next_url'] = cl.get_query_string(
+                    {'id__lt': results[-1].pk}, remove=['p']
+                )
+        return response
+
+    @admin.action(description='선택한 북마크 공개', permissions=['change'])
+    def make_public(self, request, queryset):
+        changed = bulk.set_public(queryset, True)
+        self.message_user(request, f'{changed}개 북마크를 공개했습니다.', messages.SUCCESS)
+
+    @admin.action(description='선택한 북마크 비공개', permissions=['change'])
+    def make_private(self, request, queryset):
+        changed = bulk.set_public(queryset, False)
+        self.message_user(request, f'{changed}개 북마크를 비공개했습니다.', messages.SUCCESS)
+
+    @admin.action(description='선택한 북마크 삭제', permissions=['delete'])
+    def delete_bookmarks(self, request, queryset):
+        """
+        확인 화면 → 확인하면 집합 쿼리로 삭제
+        (기본 삭제 액션처럼 관련 객체 목록을 만들지 않음)
+        """
+        if request.POST.get('post'):
+            deleted = bulk.delete(queryset)
+            self.message_user(request, f'{deleted}개 북마크를 삭제했습니다.', messages.SUCCESS)
+            return None
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': '북마크 삭제 확인',
+            'opts': self.model._meta,
+            'selected_ids': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'count': queryset.order_by()[:ADMIN_COUNT_CAP + 1].count(),
+            'count_cap': ADMIN_COUNT_CAP,
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(
+            request, 'admin/bookmarks/bookmark/delete_bookmarks.html', context
+        )
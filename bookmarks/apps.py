@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BookmarksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bookmarks'
+
+    def ready(self):
+        # 시그널 연결
+        from . import signals  # noqa: F401
+        # 작업 큐에 작업 등록 (워커 프로세스에서도 필요)
+        from . import tasks  # noqa: F401
@@ -0,0 +1,300 @@
+# bookmarks/autocomplete.py
+"""
+검색창 자동완성용 메모리 인덱스
+
+구조:
+- 정렬된 배열 [(단어, -생성시각, 북마크 id), ...] + 이진 탐색
+  → 접두어 범위를 bisect로 찾고, 같은 단어 안에서는 최신순
+- 짧은 접두어(1~2자)별 최신순 목록 [(-생성시각, 북마크 id), ...]
+  → 'a'처럼 범위가 너무 넓으면 이 목록을 최신순으로 훑다가 limit개 찾으면 멈춤
+- 단어: 제목의 각 단어, 제목 전체, 도메인(www. 제외)
+- 문서 수 상한(AUTOCOMPLETE_MAX_DOCS)을 넘으면 오래된 북마크부터 뺌
+
+갱신:
+- 같은 프로세스의 저장/삭제는 시그널로 바로 반영
+- 다른 프로세스의 변경은 updated_at 기준으로 주기적으로 가져옴
+- 결과를 내보내기 전에 DB에서 존재/공개 여부를 한 번 더 확인
+  (다른 프로세스에서 삭제되거나 비공개로 바뀐 북마크 대비)
+  → 다른 문서는 인덱스에서 고치고 다시 찾아서 limit개를 채움
+"""
+import bisect
+import heapq
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from .models import Bookmark
+
+AUTOCOMPLETE_MAX_DOCS = getattr(settings, 'AUTOCOMPLETE_MAX_DOCS', 100000)
+AUTOCOMPLETE_REFRESH_SECONDS = getattr(settings, 'AUTOCOMPLETE_REFRESH_SECONDS', 30)
+# 접두어 범위가 이보다 넓으면 단어 순서 대신 최신순 목록으로 찾음
+AUTOCOMPLETE_SCAN_LIMIT = getattr(settings, 'AUTOCOMPLETE_SCAN_LIMIT', 5000)
+# 삭제/변경된 북마크를 인덱스에서 고친 뒤 다시 찾는 최대 횟수
+AUTOCOMPLETE_SEARCH_ROUNDS = getattr(settings, 'AUTOCOMPLETE_SEARCH_ROUNDS', 3)
+# 최신순 목록을 따로 두는 접두어 길이
+RECENCY_PREFIX_LENGTH = 2
+
+WORD_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    return ' '.join(WORD_RE.findall(text.lower()))
+
+
+def domain_of(url):
+    host = (urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def terms_for(title, domain):
+    title = normalize(title)
+    terms = set(title.split())
+    if title:
+        terms.add(title)
+    if domain:
+        terms.add(domain)
+    return terms
+
+
+def short_prefixes(terms):
+    return {
+        term[:n] for term in terms
+        for n in range(1, RECENCY_PREFIX_LENGTH + 1) if len(term) >= n
+    }
+
+
+class PrefixIndex:
+    FIELDS = ('id', 'owner_id', 'title', 'url', 'is_public', 'created_at', 'updated_at')
+
+    def __init__(self, max_docs=AUTOCOMPLETE_MAX_DOCS):
+        self.max_docs = max_docs
+        self._lock = threading.RLock()
+        self._keys = []
+        # id → (title, url, domain, owner_id, is_public, created_ts, terms)
+        self._docs = {}
+        # 짧은 접두어 → [(-created_ts, id), ...] 정렬 (최신순)
+        self._recent = {}
+        # (created_ts, id) 최소 힙 → 오래된 문서부터 제거 (지연 삭제)
+        self._ages = []
+        self._built = False
+        self._watermark = None
+        self._refreshed = 0.0
+
+    # ===== 변경 =====
+
+    def _add(self, row):
+        bookmark_id = row['id']
+        self._remove(bookmark_id)
+        created_ts = row['created_at'].timestamp()
+        domain = domain_of(row['url'])
+        terms = terms_for(row['title'], domain)
+        self._docs[bookmark_id] = (
+            row['title'], row['url'], domain, row['owner_id'],
+            row['is_public'], created_ts, terms,
+        )
+        for term in terms:
+            bisect.insort(self._keys, (term, -created_ts, bookmark_id))
+        for prefix in short_prefixes(terms):
+            bisect.insort(self._recent.setdefault(prefix, []), (-created_ts, bookmark_id))
+        heapq.heappush(self._ages, (created_ts, bookmark_id))
+
+        while len(self._docs) > self.max_docs:
+            old_ts, old_id = heapq.heappop(self._ages)
+            doc = self._docs.get(old_id)
+            if doc is not None and doc[5] == old_ts:
+                self._remove(old_id)
+
+        # 갱신/삭제로 남은 힙 항목이 살아있는 문서보다 많아지면 다시 만듦
+        if len(self._ages) > 2 * len(self._docs) + 1000:
+            self._ages = [(doc[5], doc_id) for doc_id, doc in self._docs.items()]
+            heapq.heapify(self._ages)
+
+    def _remove(self, bookmark_id):
+        doc = self._docs.pop(bookmark_id, None)
+        if doc is None:
+            return
+        created_ts, terms = doc[5], doc[6]
+        for term in terms:
+            key = (term, -created_ts, bookmark_id)
+            i = bisect.bisect_left(self._keys, key)
+            if i < len(self._keys) and self._keys[i] == key:
+                del self._keys[i]
+        for prefix in short_prefixes(terms):
+            recent = self._recent.get(prefix)
+            if recent is None:
+                continue
+            key = (-created_ts, bookmark_id)
+            i = bisect.bisect_left(recent, key)
+            if i < len(recent) and recent[i] == key:
+                del recent[i]
+            if not recent:
+                del self._recent[prefix]
+
+    def update(self, bookmark):
+        with self._lock:
+            if not self._built:
+                return
+            self._add({field: getattr(bookmark, field) for field in self.FIELDS})
+
+    def remove(self, bookmark_id):
+        with self._lock:
+            if self._built:
+                self._remove(bookmark_id)
+
+    def sync(self, bookmark_ids, rows):
+        """
+        DB에서 다시 읽은 행으로 문서 고치기 (다른 프로세스의 삭제/변경 반영)
+
+        rows: {id: 행} - 없는 id는 삭제된 북마크
+        반환: 고친 문서 수
+        """
+        changed = 0
+        with self._lock:
+            for bookmark_id in bookmark_ids:
+                doc = self._docs.get(bookmark_id)
+                if doc is None:
+                    continue
+                row = rows.get(bookmark_id)
+                if row is None:
+                    self._remove(bookmark_id)
+                    changed += 1
+                elif (doc[0], doc[1], doc[3], doc[4]) != (
+                    row['title'], row['url'], row['owner_id'], row['is_public']
+                ):
+                    self._add(row)
+                    changed += 1
+        return changed
+
+    # ===== 로드 =====
+
+    def _rows(self, queryset):
+        return queryset.values(*self.FIELDS).iterator(chunk_size=2000)
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if not self._built:
+            # 최신 북마크부터 상한까지만 로드
+            rows = self._rows(Bookmark.objects.order_by('-created_at')[:self.max_docs])
+            entries = []
+            for row in rows:
+                domain = domain_of(row['url'])
+                terms = terms_for(row['title'], domain)
+                created_ts = row['created_at'].timestamp()
+                self._docs[row['id']] = (
+                    row['title'], row['url'], domain, row['owner_id'],
+                    row['is_public'], created_ts, terms,
+                )
+                self._ages.append((created_ts, row['id']))
+                entries.extend((term, -created_ts, row['id']) for term in terms)
+                for prefix in short_prefixes(terms):
+                    self._recent.setdefault(prefix, []).append((-created_ts, row['id']))
+                if self._watermark is None or row['updated_at'] > self._watermark:
+                    self._watermark = row['updated_at']
+            # 한 번에 정렬하는 게 insort 반복보다 훨씬 빠름
+            entries.sort()
+            self._keys = entries
+            for recent in self._recent.values():
+                recent.sort()
+            heapq.heapify(self._ages)
+            self._built = True
+            self._refreshed = now
+        elif now - self._refreshed > AUTOCOMPLETE_REFRESH_SECONDS:
+            # 다른 프로세스에서 바뀐 북마크
+            queryset = Bookmark.objects.order_by('updated_at')
+            if self._watermark is not None:
+                # 같은 시각의 행을 놓치지 않도록 gte (다시 넣어도 결과는 같음)
+                queryset = queryset.filter(updated_at__gte=self._watermark)
+            for row in self._rows(queryset):
+                self._add(row)
+                self._watermark = row['updated_at']
+            self._refreshed = now
+
+    # ===== 조회 =====
+
+    def search(self, prefix, user_id=None, limit=10):
+        """
+        접두어로 시작하는 단어가 있는 북마크를 최신순으로 limit개
+
+        user_id가 주인인 북마크 + 공개 북마크만
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            self._ensure_fresh()
+
+            def visible(doc):
+                return doc[4] or (user_id is not None and doc[3] == user_id)
+
+            start = bisect.bisect_left(self._keys, (prefix,))
+            end = bisect.bisect_left(self._keys, (prefix + '\U0010ffff',))
+            if len(prefix) <= RECENCY_PREFIX_LENGTH or end - start > AUTOCOMPLETE_SCAN_LIMIT:
+                # 범위가 넓음 → 최신순 목록을 훑다가 limit개 찾으면 멈춤
+                top = []
+                for neg_ts, bookmark_id in self._recent.get(prefix[:RECENCY_PREFIX_LENGTH], ()):
+                    doc = self._docs[bookmark_id]
+                    if not visible(doc):
+                        continue
+                    if (len(prefix) > RECENCY_PREFIX_LENGTH
+                            and not any(term.startswith(prefix) for term in doc[6])):
+                        continue
+                    top.append((-neg_ts, bookmark_id))
+                    if len(top) >= limit:
+                        break
+            else:
+                # 범위가 좁음 → 범위 전체에서 최신 limit개
+                seen = set()
+                candidates = []
+                for term, neg_ts, bookmark_id in self._keys[start:end]:
+                    if bookmark_id in seen:
+                        continue
+                    seen.add(bookmark_id)
+                    if visible(self._docs[bookmark_id]):
+                        candidates.append((-neg_ts, bookmark_id))
+                top = heapq.nlargest(limit, candidates)
+            return [
+                {
+                    'id': bookmark_id,
+                    'title': self._docs[bookmark_id][0],
+                    'url': self._docs[bookmark_id][1],
+                    'domain': self._docs[bookmark_id][2],
+                }
+                for _, bookmark_id in top
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._keys = []
+            self._docs = {}
+            self._recent = {}
+            self._ages = []
+            self._built = False
+            self._watermark = None
+
+
+index = PrefixIndex()
+
+
+def search(prefix, user, limit=10):
+    user_id = user.pk if user.is_authenticated else None
+    for _ in range(AUTOCOMPLETE_SEARCH_ROUNDS):
+        results = index.search(prefix, user_id, limit)
+        if not results:
+            return results
+        # 다른 프로세스에서 삭제되거나 바뀐 북마크 확인 (PK 조회라 빠름)
+        ids = [r['id'] for r in results]
+        rows = {
+            row['id']: row
+            for row in Bookmark.objects.filter(id__in=ids).values(*PrefixIndex.FIELDS)
+        }
+        # 인덱스가 DB와 같으면 결과 그대로, 다르면 인덱스를 고치고 다시 찾아서 빈자리 채움
+        if not index.sync(ids, rows):
+            break
+    return [
+        r for r in results
+        if r['id'] in rows
+        and (rows[r['id']]['is_public'] or rows[r['id']]['owner_id'] == user_id)
+    ]
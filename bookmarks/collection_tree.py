@@ -0,0 +1,202 @@
+# bookmarks/collection_tree.py
+"""
+폴더 트리 연산 (materialized path)
+
+- 하위 트리 조회: path 범위 조회 한 번 (재귀 없음)
+- 하위 트리 이동: path 앞부분을 바꾸는 UPDATE 한 번
+- 북마크 수: 북마크가 들어오고 나갈 때 조상 폴더들만 F()로 증감
+"""
+import uuid
+
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Value, When
+from django.db.models.functions import Concat, Substr
+
+from .models import Bookmark, Collection
+
+SEGMENT_LENGTH = 7
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+# path 최대 길이 255 / 세그먼트 8자
+MAX_DEPTH = 30
+
+
+class TreeError(Exception):
+    pass
+
+
+def segment(collection_id):
+    """id → 7자리 36진수 + '/'"""
+    digits = []
+    while collection_id:
+        collection_id, remainder = divmod(collection_id, 36)
+        digits.append(DIGITS[remainder])
+    return ''.join(reversed(digits)).rjust(SEGMENT_LENGTH, '0') + '/'
+
+
+def subtree_range(path):
+    """
+    path로 시작하는 문자열 범위 [path, upper)
+
+    path는 '/'로 끝나고 세그먼트 문자는 모두 '/'보다 큼
+    → 마지막 '/'를 그다음 문자('0')로 바꾼 값이 상한
+    """
+    return path, path[:-1] + '0'
+
+
+def subtree_filter(path, prefix=''):
+    lower, upper = subtree_range(path)
+    return {f'{prefix}path__gte': lower, f'{prefix}path__lt': upper}
+
+
+def ancestor_ids(path):
+    """path에 들어있는 id들 (자기 자신 포함)"""
+    return [int(part, 36) for part in path.split('/') if part]
+
+
+def subtree(collection):
+    return Collection.objects.filter(**subtree_filter(collection.path))
+
+
+def subtree_bookmarks(collection):
+    """하위 폴더까지 포함한 북마크 (collection.path 인덱스 범위 + JOIN)"""
+    return Bookmark.objects.filter(**subtree_filter(collection.path, 'collection__'))
+
+
+def create_collection(owner, name, parent=None):
+    if parent is not None:
+        if parent.owner_id != owner.pk:
+            raise TreeError('자신의 폴더 아래에만 만들 수 있습니다.')
+        if parent.depth + 1 >= MAX_DEPTH:
+            raise TreeError(f'폴더는 {MAX_DEPTH}단계까지만 만들 수 있습니다.')
+
+    with transaction.atomic():
+        # id가 있어야 path를 만들 수 있으므로 임시 path로 먼저 저장
+        # ('~'는 세그먼트 문자보다 커서 어떤 하위 트리 범위에도 안 걸림)
+        collection = Collection.objects.create(
+            owner=owner, name=name, parent=parent,
+            path=f'~{uuid.uuid4().hex}',
+            depth=parent.depth + 1 if parent else 0,
+        )
+        collection.path = (parent.path if parent else '') + segment(collection.pk)
+        Collection.objects.filter(pk=collection.pk).update(path=collection.path)
+    return collection
+
+
+def add_bookmarks(collection_id, delta):
+    """
+    폴더에 북마크가 delta개 들어옴(음수면 나감)
+
+    UPDATE 한 번: 자기 폴더는 bookmark_count와 total_count,
+    조상 폴더는 total_count만 증감
+    """
+    if not collection_id or not delta:
+        return
+    path = (
+        Collection.objects.filter(pk=collection_id)
+        .values_list('path', flat=True).first()
+    )
+    if path is None:
+        return
+    Collection.objects.filter(pk__in=ancestor_ids(path)).update(
+        total_count=F('total_count') + delta,
+        bookmark_count=Case(
+            When(pk=collection_id, then=F('bookmark_count') + delta),
+            default=F('bookmark_count'),
+            output_field=models.PositiveIntegerField(),
+        ),
+    )
+
+
+def move_collection(collection, new_parent=None):
+    """
+    하위 트리 통째로 이동
+
+    1. 기존 조상들의 total_count 감소
+    2. 하위 트리 전체의 path/depth를 UPDATE 한 번으로 변경
+    3. 새 조상들의 total_count 증가
+    """
+    with transaction.atomic():
+        collection = Collection.objects.select_for_update().get(pk=collection.pk)
+        if new_parent is not None:
+            new_parent = Collection.objects.get(pk=new_parent.pk)
+            if new_parent.owner_id != collection.owner_id:
+                raise TreeError('자신의 폴더로만 옮길 수 있습니다.')
+            if new_parent.path.startswith(collection.path):
+                raise TreeError('자기 자신이나 하위 폴더로는 옮길 수 없습니다.')
+
+        old_path = collection.path
+        new_path = (new_parent.path if new_parent else '') + segment(collection.pk)
+        if new_path == old_path:
+            return collection
+        depth_delta = (new_parent.depth + 1 if new_parent else 0) - collection.depth
+
+        if depth_delta > 0:
+            deepest = subtree(collection).order_by('-depth').values_list('depth', flat=True)[0]
+            if deepest + depth_delta >= MAX_DEPTH:
+                raise TreeError(f'폴더는 {MAX_DEPTH}단계까지만 만들 수 있습니다.')
+
+        moved = collection.total_count
+        old_ancestors = ancestor_ids(old_path)[:-1]
+        if moved and old_ancestors:
+            Collection.objects.filter(pk__in=old_ancestors).update(
+                total_count=F('total_count') - moved
+            )
+
+        subtree(collection).update(
+            path=Concat(Value(new_path), Substr('path', len(old_path) + 1)),
+            depth=F('depth') + depth_delta,
+        )
+        Collection.objects.filter(pk=collection.pk).update(parent=new_parent)
+
+        if moved and new_parent is not None:
+            Collection.objects.filter(pk__in=ancestor_ids(new_parent.path)).update(
+                total_count=F('total_count') + moved
+            )
+
+    collection.refresh_from_db()
+    return collection
+
+
+def delete_collection(collection):
+    """
+    하위 트리 삭제 (북마크는 지우지 않고 폴더만 비움)
+    """
+    with transaction.atomic():
+        collection = Collection.objects.select_for_update().get(pk=collection.pk)
+        ancestors = ancestor_ids(collection.path)[:-1]
+        if collection.total_count and ancestors:
+            Collection.objects.filter(pk__in=ancestors).update(
+                total_count=F('total_count') - collection.total_count
+            )
+        # SET_NULL을 UPDATE 한 번으로 (시그널로 하나씩 세지 않도록)
+        Bookmark.objects.filter(**subtree_filter(collection.path, 'collection__')).update(
+            collection=None
+        )
+        subtree(collection).delete()
+
+
+def rebuild_counts(owner=None):
+    """
+    북마크 수 전체 재계산 (데이터 복구/벤치마크용)
+    """
+    collections = Collection.objects.all()
+    if owner is not None:
+        collections = collections.filter(owner=owner)
+
+    with transaction.atomic():
+        direct = dict(
+            Bookmark.objects.filter(collection__in=collections)
+            .values('collection').annotate(n=Count('id'))
+            .values_list('collection', 'n')
+        )
+        rows = list(collections.only('id', 'path'))
+        totals = {row.pk: 0 for row in rows}
+        for row in rows:
+            n = direct.get(row.pk, 0)
+            for ancestor_id in ancestor_ids(row.path):
+                if ancestor_id in totals:
+                    totals[ancestor_id] += n
+        for row in rows:
+            row.bookmark_count = direct.get(row.pk, 0)
+            row.total_count = totals[row.pk]
+        Collection.objects.bulk_update(rows, ['bookmark_count', 'total_count'], batch_size=500)
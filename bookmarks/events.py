@@ -0,0 +1,186 @@
+# bookmarks/events.py
+"""
+공개 북마크 이벤트 pub/sub (SSE 스트림용)
+
+설계:
+- 프로세스 내부 브로커 하나 (외부 브로커 없음)
+- Bookmark 시그널(post_save/post_delete)이 이벤트를 발행
+- 구독자는 asyncio로 대기 → 연결당 스레드 없음, 유휴 연결 수천 개 가능
+- 최근 이벤트는 고정 크기 버퍼에 보관 → Last-Event-ID로 이어받기
+- 이벤트 id는 '<프로세스 시작 epoch>-<순번>'
+  → 다른 프로세스나 재시작된 프로세스로 재연결하면 epoch가 달라서 reset을 보냄
+    (순번만 쓰면 엉뚱한 이벤트를 재전송하거나 조용히 건너뜀)
+
+주의:
+- 시그널은 (ASGI에서도) 동기 뷰를 실행하는 워커 스레드에서 호출되므로
+  구독자 깨우기는 loop.call_soon_threadsafe로 함
+- 프로세스마다 브로커가 따로 있음 → 다른 프로세스에서 생긴 이벤트는 안 보임
+  (uvicorn --workers N이면 같은 워커에 붙은 클라이언트만 받음,
+   작업 큐 워커(run_worker)가 실행하는 계정 삭제의 deleted 이벤트도 전달되지 않음)
+"""
+import asyncio
+import itertools
+import json
+import threading
+import uuid
+from collections import deque
+
+from django.conf import settings
+
+EVENT_REPLAY_BUFFER_SIZE = getattr(settings, 'EVENT_REPLAY_BUFFER_SIZE', 1000)
+EVENT_STREAM_HEARTBEAT = getattr(settings, 'EVENT_STREAM_HEARTBEAT', 15)
+
+
+class Subscriber:
+    """
+    구독자 한 명 (SSE 연결 하나)
+
+    새 이벤트가 오면 event만 set → 실제 이벤트는 브로커 버퍼에서 읽음
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.wakeup = asyncio.Event()
+
+    def notify(self):
+        self.loop.call_soon_threadsafe(self.wakeup.set)
+
+
+class EventBroker:
+    def __init__(self, buffer_size=EVENT_REPLAY_BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self._buffer = deque(maxlen=buffer_size)
+        self._ids = itertools.count(1)
+        self._subscribers = set()
+        # 프로세스(브로커)마다 다른 값
+        self.epoch = uuid.uuid4().hex[:8]
+
+    @property
+    def last_id(self):
+        with self._lock:
+            return self._buffer[-1][0] if self._buffer else 0
+
+    def event_id(self, seq):
+        """SSE id 필드 값"""
+        return f'{self.epoch}-{seq}'
+
+    def resume_from(self, last_event_id):
+        """
+        Last-Event-ID → (이어받을 순번, reset 필요 여부)
+
+        - 없음: 처음 접속 → 지금 이후 이벤트만
+        - 다른 epoch(다른 프로세스, 재시작 전) 또는 모르는 순번: reset
+        """
+        if not last_event_id:
+            return self.last_id, False
+        epoch, _, seq = last_event_id.partition('-')
+        try:
+            seq = int(seq)
+        except ValueError:
+            return self.last_id, True
+        if epoch != self.epoch or seq > self.last_id:
+            return self.last_id, True
+        return seq, False
+
+    def publish(self, event, data):
+        """
+        이벤트 발행 (어느 스레드에서 호출해도 됨)
+        """
+        with self._lock:
+            event_id = next(self._ids)
+            self._buffer.append((event_id, event, data))
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.notify()
+            except RuntimeError:
+                # 이미 닫힌 이벤트 루프
+                self.unsubscribe(subscriber)
+        return event_id
+
+    def subscribe(self):
+        subscriber = Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def events_after(self, last_id):
+        """
+        last_id 이후의 이벤트 목록
+
+        반환: (이벤트 리스트, 놓친 이벤트가 있는지)
+        버퍼가 넘쳐서 last_id 바로 다음 이벤트가 이미 사라졌으면 놓친 것
+        """
+        with self._lock:
+            events = [item for item in self._buffer if item[0] > last_id]
+            oldest = self._buffer[0][0] if self._buffer else None
+        missed = oldest is not None and last_id + 1 < oldest
+        return events, missed
+
+
+broker = EventBroker()
+
+
+def format_sse(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, ensure_ascii=False)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def bookmark_payload(bookmark):
+    return {
+        'id': bookmark.pk,
+        'owner': bookmark.owner_id,
+        'title': bookmark.title,
+        'url': bookmark.url,
+        'description': bookmark.description,
+        'is_public': bookmark.is_public,
+        'created_at': bookmark.created_at.isoformat() if bookmark.created_at else None,
+        'updated_at': bookmark.updated_at.isoformat() if bookmark.updated_at else None,
+    }
+
+
+async def stream(last_event_id=None, heartbeat=15):
+    """
+    SSE 문자열을 하나씩 내보내는 async generator
+
+    - Last-Event-ID 이후 버퍼에 남아 있는 이벤트부터 재전송
+    - 이벤트가 없으면 heartbeat초마다 주석 한 줄 (프록시 타임아웃 방지)
+    """
+    subscriber = broker.subscribe()
+    try:
+        yield 'retry: 3000\n\n'
+        last_id, reset = broker.resume_from(last_event_id)
+        if reset:
+            # 다른 프로세스/재시작 전의 ID → 처음부터 다시
+            # reset에도 id를 붙여야 브라우저가 다음 재연결 때 옛 ID를 다시 보내지 않음
+            yield format_sse(
+                'reset', {'last_event_id': last_event_id}, broker.event_id(last_id)
+            )
+        while True:
+            subscriber.wakeup.clear()
+            events, missed = broker.events_after(last_id)
+            if missed:
+                # 버퍼에서 사라진 이벤트가 있음 → 클라이언트가 목록을 다시 받아야 함
+                # 남은 이벤트도 새 목록에 이미 반영되므로 건너뛰고 최신 순번으로 이동
+                stale = broker.event_id(last_id)
+                if events:
+                    last_id = events[-1][0]
+                    events = []
+                yield format_sse('reset', {'last_event_id': stale}, broker.event_id(last_id))
+            for seq, event, data in events:
+                yield format_sse(event, data, broker.event_id(seq))
+                last_id = seq
+            try:
+                await asyncio.wait_for(subscriber.wakeup.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+    finally:
+        broker.unsubscribe(subscriber)
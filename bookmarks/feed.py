@@ -0,0 +1,251 @@
+# bookmarks/feed.py
+"""
+홈 피드 (팔로우한 사용자의 공개 북마크)
+
+설계:
+- fan-out-on-write: 북마크가 공개되면 팔로워마다 FeedEntry를 미리 넣어둠
+  (요청 안에서 하지 않고 작업 큐 워커가 처리 - bookmarks/tasks.py)
+  → 읽을 때는 (user, created_at) 인덱스 범위 스캔 한 번
+- 팔로워가 아주 많은 계정(셀럽)은 쓰기 시 팬아웃을 하지 않음
+  → 읽을 때 해당 계정의 공개 북마크를 직접 조회해서 합침 (fan-out-on-read)
+- 피드 길이는 FEED_MAX_LENGTH로 제한 (오래된 항목부터 잘라냄)
+- 페이지네이션은 OFFSET이 아닌 keyset (created_at, bookmark_id) 커서 사용
+"""
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import F, Q
+
+from .models import Bookmark, FeedEntry, Follow, FollowStats
+from .visits import MAX_BOOKMARK_ID
+
+FEED_MAX_LENGTH = getattr(settings, 'FEED_MAX_LENGTH', 1000)
+FEED_FANOUT_MAX_FOLLOWERS = getattr(settings, 'FEED_FANOUT_MAX_FOLLOWERS', 5000)
+FEED_PAGE_SIZE = getattr(settings, 'FEED_PAGE_SIZE', 20)
+
+# bulk_create 한 번에 넣을 행 수 (SQLite 변수 개수 제한 고려)
+FANOUT_BATCH_SIZE = 500
+
+
+def follower_count(user_id):
+    """팔로워 수 (카운터 조회, COUNT 없음)"""
+    count = (
+        FollowStats.objects.filter(user_id=user_id)
+        .values_list('follower_count', flat=True).first()
+    )
+    return count or 0
+
+
+def add_follower(user_id, delta):
+    """
+    팔로워 수 증감 (Follow 시그널에서 호출)
+
+    카운터가 아직 없으면 팔로우가 생길 때 처음 한 번만 COUNT로 만듦
+    (방금 저장된 Follow가 COUNT에 들어 있으므로 delta는 더하지 않음)
+    삭제 때는 만들지 않음 → 계정 삭제 CASCADE 중에 카운터가 다시 생기지 않도록
+    """
+    counters = FollowStats.objects.filter(user_id=user_id)
+    if delta < 0:
+        counters.filter(follower_count__gte=-delta).update(
+            follower_count=F('follower_count') + delta
+        )
+    elif not counters.update(follower_count=F('follower_count') + delta):
+        FollowStats.objects.get_or_create(
+            user_id=user_id,
+            defaults={'follower_count': Follow.objects.filter(followee_id=user_id).count()},
+        )
+
+
+def is_celebrity(user_id):
+    """팔로워가 너무 많아서 fan-out-on-read로 처리하는 계정인지"""
+    return follower_count(user_id) > FEED_FANOUT_MAX_FOLLOWERS
+
+
+def enqueue_sync(bookmark):
+    """
+    트랜잭션 커밋 후 작업 큐에 피드 동기화 등록 (워커가 실행)
+
+    커밋 전에 팬아웃하면 롤백된 북마크가 피드에 들어갈 수 있음
+    공개/비공개 변경 모두 같은 작업(feed_sync:{pk}) 하나로 등록하고
+    실행할 때 그 시점의 is_public을 보고 팬아웃 또는 제거
+    → 공개 → 비공개 → 공개처럼 빠르게 바뀌어도 마지막 상태로 맞춰짐
+    """
+    from .tasks import sync_feeds
+    sync_feeds.delay(bookmark.pk, dedup_key=f'feed_sync:{bookmark.pk}')
+
+
+def sync_bookmark(bookmark_id):
+    """
+    현재 공개 여부에 맞춰 피드 반영
+
+    팬아웃 뒤에 한 번 더 제거를 시도함
+    → 팬아웃 도중 비공개로 바뀌어 다른 워커의 제거가 먼저 끝난 경우도 정리됨
+    """
+    fan_out_bookmark(bookmark_id)
+    remove_bookmark_from_feeds(bookmark_id)
+
+
+def fan_out_bookmark(bookmark_id):
+    """
+    공개 북마크를 작성자의 모든 팔로워 피드에 넣기
+    """
+    bookmark = (
+        Bookmark.objects.filter(pk=bookmark_id, is_public=True)
+        .only('id', 'owner_id', 'created_at')
+        .first()
+    )
+    if bookmark is None:
+        return 0
+    if is_celebrity(bookmark.owner_id):
+        # 읽을 때 합쳐서 보여줌
+        return 0
+
+    follower_ids = list(
+        Follow.objects.filter(followee_id=bookmark.owner_id)
+        .values_list('follower_id', flat=True)
+    )
+    entries = [
+        FeedEntry(user_id=follower_id, bookmark_id=bookmark.pk,
+                  created_at=bookmark.created_at)
+        for follower_id in follower_ids
+    ]
+    FeedEntry.objects.bulk_create(
+        entries, batch_size=FANOUT_BATCH_SIZE, ignore_conflicts=True
+    )
+    for follower_id in follower_ids:
+        trim_feed(follower_id)
+    return len(entries)
+
+
+def remove_bookmark_from_feeds(bookmark_id):
+    """지금 비공개인 북마크만 피드에서 제거 (확인과 삭제가 DELETE 한 문장)"""
+    deleted, _ = FeedEntry.objects.filter(
+        bookmark_id=bookmark_id, bookmark__is_public=False
+    ).delete()
+    return deleted
+
+
+def trim_feed(user_id):
+    """
+    FEED_MAX_LENGTH번째 항목보다 오래된 항목 삭제
+    """
+    cutoff = (
+        FeedEntry.objects.filter(user_id=user_id)
+        .order_by('-created_at', '-bookmark_id')
+        .values_list('created_at', 'bookmark_id')[FEED_MAX_LENGTH:FEED_MAX_LENGTH + 1]
+    )
+    cutoff = list(cutoff)
+    if not cutoff:
+        return
+    created_at, bookmark_id = cutoff[0]
+    FeedEntry.objects.filter(user_id=user_id).filter(
+        Q(created_at__lt=created_at)
+        | Q(created_at=created_at, bookmark_id__lte=bookmark_id)
+    ).delete()
+
+
+def backfill_follow(follower_id, followee_id):
+    """
+    새로 팔로우하면 상대의 최근 공개 북마크를 피드에 채워넣기
+    """
+    if is_celebrity(followee_id):
+        return 0
+    recent = (
+        Bookmark.objects.filter(owner_id=followee_id, is_public=True)
+        .order_by('-created_at', '-id')
+        .values_list('id', 'created_at')[:FEED_MAX_LENGTH]
+    )
+    entries = [
+        FeedEntry(user_id=follower_id, bookmark_id=bookmark_id, created_at=created_at)
+        for bookmark_id, created_at in recent
+    ]
+    FeedEntry.objects.bulk_create(
+        entries, batch_size=FANOUT_BATCH_SIZE, ignore_conflicts=True
+    )
+    trim_feed(follower_id)
+    return len(entries)
+
+
+def remove_follow(follower_id, followee_id):
+    """언팔로우 시 상대의 북마크를 내 피드에서 제거"""
+    FeedEntry.objects.filter(
+        user_id=follower_id, bookmark__owner_id=followee_id
+    ).delete()
+
+
+# ===== 커서 (keyset pagination) =====
+
+def encode_cursor(created_at, bookmark_id):
+    raw = f'{created_at.isoformat()}|{bookmark_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    잘못된 커서는 ValueError
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, bookmark_id = raw.rsplit('|', 1)
+        created_at, bookmark_id = datetime.fromisoformat(created_at), int(bookmark_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError('invalid cursor') from e
+    # SQLite INTEGER 범위 밖이면 쿼리에서 OverflowError
+    if not 0 < bookmark_id <= MAX_BOOKMARK_ID:
+        raise ValueError('invalid cursor')
+    return created_at, bookmark_id
+
+
+def _before(cursor, created_field, id_field):
+    created_at, bookmark_id = cursor
+    return Q(**{f'{created_field}__lt': created_at}) | Q(
+        **{created_field: created_at, f'{id_field}__lt': bookmark_id}
+    )
+
+
+def get_feed_page(user, cursor=None, page_size=FEED_PAGE_SIZE):
+    """
+    피드 한 페이지 조회
+
+    반환: (북마크 리스트, 다음 커서 또는 None)
+    """
+    # 1. 미리 만들어 둔 피드 (인덱스 범위 스캔)
+    entries = FeedEntry.objects.filter(user=user)
+    if cursor:
+        entries = entries.filter(_before(cursor, 'created_at', 'bookmark_id'))
+    rows = list(
+        entries.order_by('-created_at', '-bookmark_id')
+        .values_list('created_at', 'bookmark_id')[:page_size + 1]
+    )
+
+    # 2. 셀럽 계정은 읽을 때 직접 조회 (fan-out-on-read)
+    #    팔로우한 계정 수만큼 카운터 PK 조회 (팔로워를 세지 않음)
+    followee_ids = Follow.objects.filter(follower=user).values('followee_id')
+    celebrity_ids = list(
+        FollowStats.objects.filter(
+            user_id__in=followee_ids,
+            follower_count__gt=FEED_FANOUT_MAX_FOLLOWERS,
+        ).values_list('user_id', flat=True)
+    )
+    if celebrity_ids:
+        pulled = Bookmark.objects.filter(owner_id__in=celebrity_ids, is_public=True)
+        if cursor:
+            pulled = pulled.filter(_before(cursor, 'created_at', 'id'))
+        rows += list(
+            pulled.order_by('-created_at', '-id')
+            .values_list('created_at', 'id')[:page_size + 1]
+        )
+        rows.sort(reverse=True)
+
+    rows = rows[:page_size + 1]
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    by_id = Bookmark.objects.select_related('owner').filter(is_public=True).in_bulk(
+        [bookmark_id for _, bookmark_id in rows]
+    )
+    bookmarks = [by_id[bookmark_id] for _, bookmark_id in rows if bookmark_id in by_id]
+
+    next_cursor = encode_cursor(*rows[-1]) if has_more else None
+    return bookmarks, next_cursor
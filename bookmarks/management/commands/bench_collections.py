@@ -0,0 +1,126 @@
+# bookmarks/management/commands/bench_collections.py
+"""
+폴더 트리 벤치마크
+
+실행: python manage.py bench_collections --depth 10 --fanout 2 --bookmarks 100000
+개발 DB를 건드리지 않도록 테스트 DB를 만들어서 측정하고 지움
+"""
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from bookmarks import collection_tree
+from bookmarks.models import Bookmark, Collection
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = '깊은 폴더 트리에서 하위 트리 조회/이동/북마크 수 갱신 시간 측정'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--depth', type=int, default=10)
+        parser.add_argument('--fanout', type=int, default=2)
+        parser.add_argument('--bookmarks', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def timed(self, label, func, repeat):
+        best = float('inf')
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            best = min(best, time.perf_counter() - start)
+        self.stdout.write(f'{label:<40}{best * 1000:>10.2f} ms')
+        return result
+
+    def run(self, options):
+        random.seed(0)
+        owner = User.objects.create_user('bench', password='bench-password-1')
+
+        # 1. 트리 생성
+        start = time.perf_counter()
+        levels = [[collection_tree.create_collection(owner, 'root')]]
+        for depth in range(1, options['depth']):
+            levels.append([
+                collection_tree.create_collection(owner, f'd{depth}-{i}', parent)
+                for parent in levels[-1]
+                for i in range(options['fanout'])
+            ])
+        collections = [c for level in levels for c in level]
+        self.stdout.write(
+            f'folders={len(collections)} depth={options["depth"]} '
+            f'({(time.perf_counter() - start) * 1000:.0f} ms)'
+        )
+
+        # 2. 북마크 생성 (시그널 없이 넣고 수는 한 번에 재계산)
+        start = time.perf_counter()
+        Bookmark.objects.bulk_create(
+            [
+                Bookmark(
+                    owner=owner, title=f'bookmark {i}',
+                    url=f'https://example.com/{i}',
+                    collection=random.choice(collections),
+                )
+                for i in range(options['bookmarks'])
+            ],
+            batch_size=1000,
+        )
+        collection_tree.rebuild_counts(owner)
+        self.stdout.write(
+            f'bookmarks={options["bookmarks"]} '
+            f'({(time.perf_counter() - start) * 1000:.0f} ms)'
+        )
+
+        repeat = options['repeat']
+        root = Collection.objects.get(pk=levels[0][0].pk)
+        middle = Collection.objects.get(pk=levels[len(levels) // 2][0].pk)
+        leaf = Collection.objects.get(pk=levels[-1][0].pk)
+
+        # 3. 하위 트리 조회
+        for label, node in (('root', root), ('middle', middle), ('leaf', leaf)):
+            self.timed(
+                f'subtree count ({label})',
+                lambda: collection_tree.subtree_bookmarks(node).count(),
+                repeat,
+            )
+            self.timed(
+                f'subtree first page ({label})',
+                lambda: list(collection_tree.subtree_bookmarks(node)[:20]),
+                repeat,
+            )
+
+        # 4. 북마크 수 증감 (조상 폴더 UPDATE 한 번, 넣고 빼기)
+        def add_and_remove():
+            collection_tree.add_bookmarks(leaf.pk, 1)
+            collection_tree.add_bookmarks(leaf.pk, -1)
+        self.timed('leaf counts +1/-1 (2 updates)', add_and_remove, repeat)
+
+        # 5. 하위 트리 이동 (두 형제 사이를 왕복)
+        # 현재 부모(levels[1][0])로 먼저 옮기면 아무것도 안 하고 끝나므로 다른 폴더부터
+        subject = levels[2][0]
+        other = levels[1][1] if len(levels[1]) > 1 else levels[0][0]
+        targets = [other, levels[1][0]]
+        moves = iter(targets * repeat)
+        self.timed(
+            f'move subtree ({collection_tree.subtree(subject).count()} folders)',
+            lambda: collection_tree.move_collection(subject, next(moves)),
+            repeat,
+        )
+
+        # 6. 정합성 확인
+        expected = {c.pk: (c.bookmark_count, c.total_count) for c in Collection.objects.all()}
+        collection_tree.rebuild_counts(owner)
+        actual = {c.pk: (c.bookmark_count, c.total_count) for c in Collection.objects.all()}
+        self.stdout.write('counts consistent: ' + ('yes' if expected == actual else 'NO'))
@@ -0,0 +1,76 @@
+# bookmarks/management/commands/bench_renderers.py
+"""
+응답 포맷 벤치마크 (인코딩 시간, 전송 크기)
+
+실행: python manage.py bench_renderers --rows 1000 --owners 20 --domains 50
+DB는 사용하지 않음 (저장하지 않은 Bookmark 객체로 측정)
+"""
+import gzip
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from bookmarks.models import Bookmark
+from bookmarks.renderers import ColumnarJSONRenderer, MessagePackRenderer, msgpack
+from bookmarks.serializers import BookmarkSerializer
+
+
+class Command(BaseCommand):
+    help = '북마크 목록 렌더러별 인코딩 시간과 응답 크기 비교'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--owners', type=int, default=20)
+        parser.add_argument('--domains', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        now = timezone.now()
+        bookmarks = [
+            Bookmark(
+                id=i + 1,
+                owner_id=i % options['owners'] + 1,
+                title=f'Bookmark title number {i}',
+                url=f'https://site{i % options["domains"]}.example.com/articles/{i}',
+                description='A short description of the bookmarked page.',
+                is_public=i % 3 != 0,
+                created_at=now - timedelta(minutes=i),
+                updated_at=now - timedelta(minutes=i),
+            )
+            for i in range(rows)
+        ]
+
+        start = time.perf_counter()
+        data = BookmarkSerializer(bookmarks, many=True).data
+        serialize_ms = (time.perf_counter() - start) * 1000
+        self.stdout.write(f'rows={rows} serializer={serialize_ms:.1f}ms')
+
+        renderers = [JSONRenderer(), ColumnarJSONRenderer()]
+        if msgpack is not None:
+            renderers.append(MessagePackRenderer())
+        else:
+            self.stdout.write('msgpack 미설치 → MessagePack 생략')
+
+        self.stdout.write(
+            f'{"format":<12}{"encode ms":>12}{"bytes":>12}{"gzip bytes":>12}{"gzip ms":>10}'
+        )
+        for renderer in renderers:
+            best = float('inf')
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                body = renderer.render(data)
+                best = min(best, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            # GZipMiddleware와 같은 압축 레벨
+            compressed = gzip.compress(body, compresslevel=6)
+            gzip_ms = (time.perf_counter() - start) * 1000
+
+            self.stdout.write(
+                f'{renderer.format:<12}{best * 1000:>12.2f}{len(body):>12}'
+                f'{len(compressed):>12}{gzip_ms:>10.2f}'
+            )
@@ -0,0 +1,21 @@
+# bookmarks/management/commands/compact_snapshots.py
+"""
+스냅샷 팩 파일 정리
+
+실행: python manage.py compact_snapshots --min-live-ratio 0.5
+cron 등으로 주기적으로 실행
+"""
+from django.core.management.base import BaseCommand
+
+from bookmarks.snapshots import compact_packs
+
+
+class Command(BaseCommand):
+    help = '삭제된 스냅샷 청크가 많은 팩 파일을 다시 써서 디스크 공간 회수'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-live-ratio', type=float, default=0.5)
+
+    def handle(self, *args, **options):
+        removed = compact_packs(options['min_live_ratio'])
+        self.stdout.write(f'정리한 팩 파일: {removed}개')
@@ -0,0 +1,34 @@
+# bookmarks/management/commands/purge_accounts.py
+"""
+탈퇴 계정 데이터 삭제 진행 상황 확인 / 이어서 실행
+
+실행:
+- python manage.py purge_accounts          → 진행 상황만 출력
+- python manage.py purge_accounts --resume → 끝나지 않은 삭제를 이어서 실행
+"""
+from django.core.management.base import BaseCommand
+
+from bookmarks.models import AccountPurge
+from bookmarks.purge import run_purge
+
+
+class Command(BaseCommand):
+    help = '탈퇴 계정의 북마크 삭제 진행 상황 출력 및 중단된 작업 재개'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resume', action='store_true')
+
+    def handle(self, *args, **options):
+        unfinished = AccountPurge.objects.exclude(status=AccountPurge.STATUS_DONE)
+
+        for account_purge in unfinished.order_by('created_at'):
+            self.stdout.write(
+                f'#{account_purge.pk} {account_purge.username} '
+                f'{account_purge.status} {account_purge.deleted}/{account_purge.total}'
+            )
+            if options['resume']:
+                account_purge = run_purge(account_purge.pk)
+                self.stdout.write(f'  → {account_purge.status}')
+
+        if not unfinished.exists():
+            self.stdout.write('진행 중인 삭제가 없습니다.')
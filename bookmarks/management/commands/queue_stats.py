@@ -0,0 +1,42 @@
+# bookmarks/management/commands/queue_stats.py
+"""
+작업 큐 상태 (대기 수, 지연 시간)
+
+실행:
+- python manage.py queue_stats
+- python manage.py queue_stats --window 3600 --json   → 모니터링 수집용
+"""
+import json
+
+from django.core.management.base import BaseCommand
+
+from bookmarks import taskqueue
+
+
+class Command(BaseCommand):
+    help = '작업 큐 상태별 작업 수와 최근 대기/실행 시간 출력'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window', type=int, default=300,
+                            help='지연 시간을 계산할 최근 구간(초)')
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        stats = taskqueue.queue.metrics(window=options['window'])
+        if options['json']:
+            self.stdout.write(json.dumps(stats))
+            return
+
+        depth = stats['depth']
+        self.stdout.write(
+            f"대기 {depth['queued']} / 실행 중 {depth['running']} / "
+            f"완료 {depth['done']} / 실패 {depth['failed']}"
+        )
+        for name, n in sorted(stats['queued_by_name'].items()):
+            self.stdout.write(f'  {name}: {n}')
+        self.stdout.write(f"가장 오래 기다린 작업: {stats['oldest_queued_seconds']}초")
+        self.stdout.write(
+            f"최근 {stats['window_seconds']}초 완료 {stats['completed']}개 - "
+            f"대기 p50 {stats['wait_p50']}초 p95 {stats['wait_p95']}초, "
+            f"실행 p50 {stats['run_p50']}초 p95 {stats['run_p95']}초"
+        )
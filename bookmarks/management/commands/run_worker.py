@@ -0,0 +1,93 @@
+# bookmarks/management/commands/run_worker.py
+"""
+작업 큐 워커 (bookmarks/taskqueue.py)
+
+실행:
+- python manage.py run_worker                 → CPU 수만큼 워커 프로세스
+- python manage.py run_worker --processes 4
+- python manage.py run_worker --once          → 지금 쌓인 작업만 이 프로세스에서 처리하고 종료 (cron/테스트용)
+
+Ctrl+C / SIGTERM: 워커는 실행 중인 작업을 끝내고 종료
+"""
+import multiprocessing
+import os
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from bookmarks import taskqueue
+
+# 워커가 종료 신호 후 작업을 마무리할 때까지 기다리는 시간(초)
+SHUTDOWN_TIMEOUT = 30
+
+
+def work(number, poll):
+    """워커 프로세스 본체"""
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    signal.signal(signal.SIGINT, lambda *_: stopping.append(True))
+
+    name = f'{os.uname().nodename}:{os.getpid()}:{number}'
+    while not stopping:
+        done = taskqueue.run_once(name)
+        close_old_connections()
+        if not done:
+            time.sleep(poll)
+    taskqueue.queue.close()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = '작업 큐 워커 프로세스 실행'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--poll', type=float, default=1.0,
+                            help='큐가 비었을 때 다시 확인하는 간격(초)')
+        parser.add_argument('--once', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            total = 0
+            while done := taskqueue.run_once('once'):
+                total += done
+            self.stdout.write(f'{total}개 작업 처리')
+            return
+
+        # fork 전에 부모의 DB 연결을 닫아야 자식이 같은 연결을 나눠 쓰지 않음
+        connections.close_all()
+        taskqueue.queue.close()
+
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+        signal.signal(signal.SIGINT, lambda *_: stopping.append(True))
+
+        def start(number):
+            process = multiprocessing.Process(
+                target=work, args=(number, options['poll']),
+                name=f'task-worker-{number}',
+            )
+            process.start()
+            return process
+
+        workers = [start(number) for number in range(options['processes'])]
+        self.stdout.write(f'워커 {len(workers)}개 시작 (큐: {taskqueue.queue.path})')
+
+        while not stopping:
+            # 죽은 워커는 다시 띄움 (실행 중이던 작업은 visibility timeout 뒤 재실행)
+            for number, process in enumerate(workers):
+                if not process.is_alive():
+                    self.stderr.write(f'워커 {number} 종료됨 (exit {process.exitcode}), 재시작')
+                    workers[number] = start(number)
+            time.sleep(1)
+
+        self.stdout.write('종료 중...')
+        for process in workers:
+            process.terminate()  # SIGTERM → 현재 작업을 마치고 종료
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        for process in workers:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
@@ -0,0 +1,17 @@
+# bookmarks/middleware.py
+from django.middleware.gzip import GZipMiddleware as BaseGZipMiddleware
+
+
+class GZipMiddleware(BaseGZipMiddleware):
+    """
+    Django GZipMiddleware + SSE 제외
+
+    async 스트리밍 응답은 조각마다 따로 gzip 멤버로 압축됨
+    → 이벤트/keep-alive마다 헤더 오버헤드가 붙고,
+      첫 멤버만 푸는 클라이언트/프록시는 이후 이벤트를 못 받음
+    """
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookmarks', '0003_follow_feedentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('size', models.PositiveIntegerField()),
+                ('manifest', models.TextField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SnapshotChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('pack', models.CharField(db_index=True, max_length=100)),
+                ('offset', models.BigIntegerField()),
+                ('length', models.PositiveIntegerField()),
+                ('size', models.PositiveIntegerField()),
+                ('codec', models.CharField(max_length=10)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Snapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_type', models.CharField(default='text/html', max_length=100)),
+                ('captured_at', models.DateTimeField(auto_now=True)),
+                ('bookmark', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='snapshot', to='bookmarks.bookmark')),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='snapshots', to='bookmarks.pagecontent')),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookmarks', '0005_bookmark_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookmarkStats',
+            fields=[
+                ('bookmark', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='bookmarks.bookmark')),
+                ('visit_count', models.PositiveIntegerField(default=0)),
+                ('score', models.FloatField(db_index=True, default=0.0)),
+                ('last_visited_at', models.DateTimeField(null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookmarks', '0009_bookmarkquota'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookmark',
+            index=models.Index(fields=['is_public', '-id'], name='bookmarks_b_is_publ_ed52e7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookmark',
+            index=models.Index(fields=['owner', '-id'], name='bookmarks_b_owner_i_74212d_idx'),
+        ),
+    ]
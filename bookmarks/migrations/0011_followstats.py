@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_follower_counts(apps, schema_editor):
+    """이미 있는 팔로우 관계로 카운터 채우기"""
+    Follow = apps.get_model('bookmarks', 'Follow')
+    FollowStats = apps.get_model('bookmarks', 'FollowStats')
+    counts = (
+        Follow.objects.values('followee_id')
+        .annotate(n=models.Count('id'))
+        .values_list('followee_id', 'n')
+    )
+    FollowStats.objects.bulk_create(
+        [FollowStats(user_id=user_id, follower_count=n) for user_id, n in counts],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('bookmarks', '0010_bookmark_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='follow_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('follower_count', models.PositiveIntegerField(db_index=True, default=0)),
+            ],
+        ),
+        migrations.RunPython(fill_follower_counts, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,47 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+
+class Collection(models.Model):
+    """
+    북마크 폴더 (중첩 가능)
+
+    materialized path 방식:
+    - path: 루트부터 자기까지의 id를 7자리 36진수로 이은 문자열
+      예) '0000001/000000a/' → id 1 폴더 아래의 id 10 폴더
+    - 하위 폴더 전체 = path가 내 path로 시작하는 행 = 인덱스 범위 조회 한 번
+    - bookmark_count: 이 폴더에 바로 들어있는 북마크 수
+    - total_count: 하위 폴더까지 포함한 북마크 수
+    """
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='collections'
+    )
+    name = models.CharField(max_length=100)
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='children'
+    )
+    path = models.CharField(max_length=255, unique=True)
+    depth = models.PositiveSmallIntegerField(default=0)
+    bookmark_count = models.PositiveIntegerField(default=0)
+    total_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['path']  # 트리 순서
+        indexes = [
+            models.Index(fields=['owner', 'path']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
 class Bookmark(models.Model):
     """
     북마크 모델
@@ -23,11 +64,263 @@ class Bookmark(models.Model):
     description = models.TextField(blank=True)
     # 새로 추가하는 필드
     is_public = models.BooleanField('공개 여부', default=True)
+    collection = models.ForeignKey(
+        Collection,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='bookmarks'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    # 자동완성 인덱스가 다른 프로세스의 변경분을 가져올 때 사용
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-created_at']  # 최신순 정렬
+        indexes = [
+            # 관리자 목록: id 역순 + 공개 여부/주인 필터
+            models.Index(fields=['is_public', '-id']),
+            models.Index(fields=['owner', '-id']),
+        ]
         
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        DB에서 읽었을 때의 공개 여부, 폴더를 기억해 둠
+        → 저장 시그널에서 공개/비공개 전환, 폴더 이동을 추가 쿼리 없이 알 수 있음
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_public = instance.__dict__.get('is_public')
+        instance._loaded_collection_id = instance.__dict__.get('collection_id')
+        return instance
+
+class Follow(models.Model):
+    """
+    팔로우 관계
+
+    - follower가 followee를 팔로우
+    - (follower, followee) 쌍은 한 번만 저장
+    """
+    follower = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following'
+    )
+    followee = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='followers'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['follower', 'followee'],
+                name='unique_follow'
+            ),
+        ]
+        # 팬아웃 시 "이 사람의 팔로워 목록" 조회용
+        indexes = [
+            models.Index(fields=['followee', 'follower']),
+        ]
+
+    def __str__(self):
+        return f'{self.follower} -> {self.followee}'
+
+
+class FollowStats(models.Model):
+    """
+    사용자별 팔로워 수 (셀럽 판단용 카운터)
+
+    피드를 읽을 때마다 팔로워를 COUNT 하지 않도록
+    Follow 저장/삭제 시그널로 증감
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='follow_stats'
+    )
+    follower_count = models.PositiveIntegerField(default=0, db_index=True)
+
+    def __str__(self):
+        return f'{self.user_id}: {self.follower_count}'
+
+
+class FeedEntry(models.Model):
+    """
+    홈 피드 (fan-out-on-write로 미리 만들어 두는 테이블)
+
+    실무 팁:
+    - 북마크가 공개될 때 팔로워마다 한 줄씩 넣어둠
+    - 읽을 때는 (user, created_at) 인덱스만 타면 끝 → JOIN 없음
+    - created_at은 북마크의 생성 시각을 복사해서 정렬/커서에 사용
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    bookmark = models.ForeignKey(
+        Bookmark,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'bookmark'],
+                name='unique_feed_entry'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-bookmark']),
+        ]
+
+
+class SnapshotChunk(models.Model):
+    """
+    스냅샷 청크 (압축된 상태로 팩 파일에 저장)
+
+    - digest: 압축 전 내용의 sha256 → 같은 청크는 한 번만 저장
+    - pack/offset/length: 팩 파일 안의 위치
+    - ref_count: 이 청크를 쓰는 PageContent 수 (0이 되면 삭제)
+    """
+    digest = models.CharField(max_length=64, unique=True)
+    pack = models.CharField(max_length=100, db_index=True)
+    offset = models.BigIntegerField()
+    length = models.PositiveIntegerField()
+    size = models.PositiveIntegerField()
+    codec = models.CharField(max_length=10)
+    ref_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.digest
+
+
+class PageContent(models.Model):
+    """
+    페이지 내용 (content-addressed)
+
+    여러 사용자가 같은 페이지를 저장해도 한 줄만 생김
+    - manifest: 청크 digest를 순서대로 공백으로 이은 문자열
+    - ref_count: 이 내용을 쓰는 스냅샷 수
+    """
+    digest = models.CharField(max_length=64, unique=True)
+    size = models.PositiveIntegerField()
+    manifest = models.TextField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.digest
+
+
+class Snapshot(models.Model):
+    """
+    북마크 페이지 스냅샷 (북마크당 하나, 다시 찍으면 교체)
+    """
+    bookmark = models.OneToOneField(
+        Bookmark,
+        on_delete=models.CASCADE,
+        related_name='snapshot'
+    )
+    content = models.ForeignKey(
+        PageContent,
+        on_delete=models.PROTECT,
+        related_name='snapshots'
+    )
+    content_type = models.CharField(max_length=100, default='text/html')
+    captured_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.bookmark} @ {self.captured_at}'
+
+
+class BookmarkStats(models.Model):
+    """
+    북마크 방문 통계 (클릭할 때마다가 아니라 모아서 주기적으로 갱신)
+
+    score: 시간 감쇠 인기도를 로그 공간에 저장한 값
+    - 방문 한 번의 기여도 = exp((방문 시각 - 기준 시각) / tau)
+    - 최근 방문일수록 값이 큼 → 정렬 순서가 "지금 기준 감쇠 점수"와 같음
+    - 시간이 지나도 다시 계산할 필요 없음 → score 인덱스로 바로 정렬
+    """
+    bookmark = models.OneToOneField(
+        Bookmark,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    visit_count = models.PositiveIntegerField(default=0)
+    score = models.FloatField(default=0.0, db_index=True)
+    last_visited_at = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return f'{self.bookmark_id}: {self.visit_count}'
+
+
+class AccountPurge(models.Model):
+    """
+    탈퇴한 계정의 데이터 삭제 진행 상황
+
+    사용자를 바로 지우면 북마크 수십만 개가 한 트랜잭션에서 지워짐
+    → 비활성화만 먼저 하고 북마크는 조금씩 나눠서 삭제
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, '대기'),
+        (STATUS_RUNNING, '진행 중'),
+        (STATUS_DONE, '완료'),
+        (STATUS_FAILED, '실패'),
+    ]
+
+    # 마지막에 사용자가 지워지면 NULL (기록은 남김)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='purges'
+    )
+    username = models.CharField(max_length=150)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    total = models.PositiveIntegerField(default=0)
+    deleted = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.username} ({self.deleted}/{self.total})'
+
+
+class BookmarkQuota(models.Model):
+    """
+    사용자별 북마크 수 (할당량 확인용 카운터)
+
+    북마크를 만들 때마다 COUNT(*) 하지 않도록
+    Bookmark 저장/삭제 시그널로 증감
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='bookmark_quota'
+    )
+    bookmark_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.user_id}: {self.bookmark_count}'
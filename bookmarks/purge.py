@@ -0,0 +1,119 @@
+# bookmarks/purge.py
+"""
+계정 삭제 (나눠서 지우기)
+
+실무 팁:
+- user.delete()는 CASCADE로 북마크 전체를 한 트랜잭션에서 지움
+  → SQLite 쓰기 잠금을 삭제가 끝날 때까지 잡고 있음
+- 그래서 탈퇴 요청 시에는 비활성화 + 토큰 폐기 + 북마크 비공개 전환만 하고
+  (삭제가 끝날 때까지 목록, 피드, 자동완성, 인기 목록에 보이지 않도록)
+  북마크는 ACCOUNT_PURGE_BATCH_SIZE개씩 짧은 트랜잭션으로 삭제
+- 배치마다 일반 delete()를 쓰므로 Bookmark 시그널이 그대로 실행됨
+  → 피드, 스냅샷 참조, 자동완성, 폴더 북마크 수 등이 함께 정리됨
+- 삭제는 작업 큐 워커가 실행 (python manage.py run_worker)
+- 중간에 프로세스가 죽어도 python manage.py purge_accounts 로 이어서 진행
+"""
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken, OutstandingToken,
+)
+
+from .models import AccountPurge, Bookmark, FeedEntry, Follow
+
+ACCOUNT_PURGE_BATCH_SIZE = getattr(settings, 'ACCOUNT_PURGE_BATCH_SIZE', 200)
+# 배치 사이에 쉬는 시간(초) - 다른 요청이 쓰기 잠금을 잡을 틈
+ACCOUNT_PURGE_PAUSE = getattr(settings, 'ACCOUNT_PURGE_PAUSE', 0.05)
+
+
+def request_purge(user):
+    """
+    탈퇴 요청: 즉시 비활성화하고 삭제 작업 등록
+    """
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+
+        # 이미 발급된 refresh token 폐기
+        for token in OutstandingToken.objects.filter(user=user):
+            BlacklistedToken.objects.get_or_create(token=token)
+
+        # 북마크 비공개 전환 (UPDATE 한 번, 시그널 없음)
+        # 다른 프로세스의 자동완성 인덱스도 updated_at을 보고 따라옴
+        Bookmark.objects.filter(owner=user, is_public=True).update(
+            is_public=False, updated_at=timezone.now()
+        )
+        FeedEntry.objects.filter(bookmark__owner=user).delete()
+
+        purge = AccountPurge.objects.create(
+            user=user,
+            username=user.get_username(),
+            total=Bookmark.objects.filter(owner=user).count(),
+        )
+        enqueue_purge(purge.pk)
+    return purge
+
+
+def enqueue_purge(purge_id):
+    """커밋 후 작업 큐에 삭제 등록 (워커가 실행)"""
+    from .tasks import purge_account
+    purge_account.delay(purge_id, dedup_key=f'purge:{purge_id}')
+
+
+def _delete_in_batches(queryset, batch_size):
+    """
+    pk 순서로 batch_size개씩 삭제, 배치마다 실제로 삭제한 개수를 yield
+    (다른 곳에서 먼저 지운 행은 세지 않음, CASCADE로 함께 지워진 행도 제외)
+    """
+    label = queryset.model._meta.label
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        with transaction.atomic():
+            _, per_model = queryset.model.objects.filter(pk__in=ids).delete()
+        yield per_model.get(label, 0)
+        if ACCOUNT_PURGE_PAUSE:
+            time.sleep(ACCOUNT_PURGE_PAUSE)
+
+
+def run_purge(purge_id, batch_size=ACCOUNT_PURGE_BATCH_SIZE):
+    """
+    북마크 → 팔로우 관계 → 사용자 순서로 삭제
+    """
+    purge = AccountPurge.objects.get(pk=purge_id)
+    if purge.status == AccountPurge.STATUS_DONE:
+        return purge
+
+    purge.status = AccountPurge.STATUS_RUNNING
+    purge.save(update_fields=['status', 'updated_at'])
+
+    try:
+        if purge.user_id is not None:
+            bookmarks = Bookmark.objects.filter(owner_id=purge.user_id)
+            for deleted in _delete_in_batches(bookmarks, batch_size):
+                purge.deleted += deleted
+                purge.save(update_fields=['deleted', 'updated_at'])
+
+            # 팔로워가 많은 계정은 팔로우 관계도 많음
+            follows = Follow.objects.filter(followee_id=purge.user_id)
+            for _ in _delete_in_batches(follows, batch_size * 5):
+                pass
+
+            # 남은 데이터(폴더, 피드 등)는 작으므로 한 번에
+            with transaction.atomic():
+                purge.user.delete()
+    except Exception as e:
+        purge.status = AccountPurge.STATUS_FAILED
+        purge.error = str(e)
+        purge.save(update_fields=['status', 'error', 'updated_at'])
+        raise
+
+    purge.status = AccountPurge.STATUS_DONE
+    purge.user = None
+    purge.finished_at = timezone.now()
+    purge.save(update_fields=['status', 'user', 'finished_at', 'updated_at'])
+    return purge
@@ -0,0 +1,56 @@
+# bookmarks/quotas.py
+"""
+사용자별 북마크 할당량
+
+- 카운터(BookmarkQuota)는 시그널로 증감 → 생성할 때 COUNT(*) 없음
+- 처음 한 번만 COUNT(*)로 카운터를 만듦
+- 확인은 조건부 UPDATE 한 번: 쓰기 잠금을 잡은 채로 확인 → 같은 트랜잭션에서 저장
+  (동시에 여러 요청이 와도 한도를 넘지 않음)
+"""
+from django.conf import settings
+from django.db.models import F
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import Bookmark, BookmarkQuota
+
+BOOKMARK_QUOTA = getattr(settings, 'BOOKMARK_QUOTA', 10000)
+
+
+class QuotaExceeded(APIException):
+    status_code = status.HTTP_403_FORBIDDEN
+    default_detail = '북마크 저장 한도를 초과했습니다.'
+    default_code = 'quota_exceeded'
+
+
+def ensure_counter(user):
+    BookmarkQuota.objects.get_or_create(
+        user=user,
+        defaults={'bookmark_count': Bookmark.objects.filter(owner=user).count()},
+    )
+
+
+def check_quota(user, limit=None):
+    """
+    북마크 하나를 더 만들 수 있는지 확인 (transaction.atomic 안에서 호출)
+
+    값을 바꾸지 않는 UPDATE지만 행 잠금(SQLite는 쓰기 잠금)을 잡아서
+    커밋까지 다른 요청의 확인이 기다리게 됨
+    """
+    if user.is_staff:
+        return
+    limit = BOOKMARK_QUOTA if limit is None else limit
+    ensure_counter(user)
+    updated = BookmarkQuota.objects.filter(
+        user=user, bookmark_count__lt=limit
+    ).update(bookmark_count=F('bookmark_count'))
+    if not updated:
+        raise QuotaExceeded(f'북마크는 {limit}개까지 저장할 수 있습니다.')
+
+
+def add(user_id, delta):
+    """카운터 증감 (아직 카운터가 없으면 처음 만들 때 COUNT로 맞춰짐)"""
+    counters = BookmarkQuota.objects.filter(user_id=user_id)
+    if delta < 0:
+        counters = counters.filter(bookmark_count__gte=-delta)
+    counters.update(bookmark_count=F('bookmark_count') + delta)
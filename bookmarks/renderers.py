@@ -0,0 +1,141 @@
+# bookmarks/renderers.py
+"""
+북마크 목록용 응답 포맷 (Accept 헤더 또는 ?format= 으로 선택)
+
+- application/json (기본): DRF JSONRenderer
+- application/vnd.bookmarkhero.columnar+json (?format=columnar)
+  → 행마다 키를 반복하지 않고 필드마다 배열 하나
+- application/msgpack (?format=msgpack)
+  → msgpack 패키지가 설치되어 있을 때만 사용 가능
+
+압축(gzip)은 Accept-Encoding을 보고 GZipMiddleware가 처리
+"""
+from urllib.parse import urlsplit
+
+from rest_framework.renderers import JSONRenderer, BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성
+    msgpack = None
+
+
+def _is_rows(value):
+    return (
+        isinstance(value, list)
+        and bool(value)
+        and all(isinstance(row, dict) for row in value)
+    )
+
+
+def _dictionary_encode(values):
+    """
+    반복되는 값을 문자열 테이블 + 인덱스로 변환
+    반복이 적어서 이득이 없으면 None
+    """
+    table = {}
+    codes = []
+    for value in values:
+        # bool은 이득이 없고 1/True가 같은 키로 합쳐지므로 제외
+        if isinstance(value, (dict, list, bool)):
+            return None
+        codes.append(table.setdefault(value, len(table)))
+    if len(table) * 2 > len(values):
+        return None
+    return {'dict': list(table), 'codes': codes}
+
+
+def _url_encode(values):
+    """
+    URL을 'scheme://도메인' 테이블 + 나머지 경로로 분리
+    같은 도메인의 북마크가 많을 때 크기가 크게 줄어듦
+    """
+    table = {}
+    codes = []
+    suffixes = []
+    for value in values:
+        if not isinstance(value, str):
+            return None
+        parts = urlsplit(value)
+        prefix = f'{parts.scheme}://{parts.netloc}'
+        if not value.startswith(prefix):
+            return None
+        codes.append(table.setdefault(prefix, len(table)))
+        suffixes.append(value[len(prefix):])
+    return {'prefix_dict': list(table), 'codes': codes, 'suffix': suffixes}
+
+
+def to_columnar(rows, url_fields=('url',)):
+    """
+    [{...}, {...}] → {"columns": [...], "length": n, "data": {필드: 컬럼}}
+
+    컬럼 형식 (클라이언트 디코딩 방법):
+    - 배열: 그대로 i번째 값
+    - {"dict": [...], "codes": [...]}: dict[codes[i]]
+    - {"prefix_dict": [...], "codes": [...], "suffix": [...]}:
+      prefix_dict[codes[i]] + suffix[i]
+    """
+    columns = list(rows[0])
+    for row in rows[1:]:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+
+    data = {}
+    for column in columns:
+        values = [row.get(column) for row in rows]
+        encoded = None
+        if column in url_fields:
+            encoded = _url_encode(values)
+        if encoded is None:
+            encoded = _dictionary_encode(values)
+        data[column] = encoded if encoded is not None else values
+
+    return {'columns': columns, 'length': len(rows), 'data': data}
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    컬럼 방식 JSON
+
+    목록(또는 페이지네이션의 results)만 변환하고
+    상세 조회/에러 응답은 일반 JSON 그대로
+    """
+    media_type = 'application/vnd.bookmarkhero.columnar+json'
+    format = 'columnar'
+    url_fields = ('url',)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if _is_rows(data):
+            data = to_columnar(data, self.url_fields)
+        elif isinstance(data, dict) and _is_rows(data.get('results')):
+            data = {**data, 'results': to_columnar(data['results'], self.url_fields)}
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack (바이너리)
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # 날짜, Decimal 등은 JSON과 같은 방식으로 변환
+        return msgpack.packb(data, default=JSONEncoder().default, use_bin_type=True)
+
+
+def bookmark_renderer_classes(defaults):
+    """
+    DRF 기본 렌더러 + 북마크용 렌더러
+    msgpack이 없으면 MessagePackRenderer는 빠짐 → Accept: application/msgpack은 406
+    """
+    classes = list(defaults) + [ColumnarJSONRenderer]
+    if msgpack is not None:
+        classes.append(MessagePackRenderer)
+    return classes
@@ -1,6 +1,6 @@
 # bookmarks/serializers.py (Step 5)
 from rest_framework import serializers
-from .models import Bookmark
+from .models import Bookmark, Collection
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -61,6 +61,17 @@ class BookmarkSerializer(serializers.ModelSerializer):
         return clean_title
 
 
+    def validate_collection(self, value):
+        """
+        자신의 폴더에만 넣을 수 있음
+        """
+        request = self.context.get('request')
+        if value is not None and request is not None and value.owner_id != request.user.pk:
+            raise serializers.ValidationError(
+                "자신의 폴더에만 넣을 수 있습니다."
+            )
+        return value
+
     def validate(self, attrs):
         is_public = attrs.get('is_public')
         description = attrs.get('description')
@@ -92,6 +103,57 @@ class BookmarkSerializer(serializers.ModelSerializer):
 # 잘 동작하는지 postman 으로 확인
 # 9시 50분까지 완료하겠습니다.
 
+class CollectionSerializer(serializers.ModelSerializer):
+    """
+    폴더 Serializer
+
+    - parent는 생성할 때만 지정 (이동은 move 액션 사용)
+    - path, depth, 북마크 수는 서버가 관리
+    """
+    class Meta:
+        model = Collection
+        fields = ['id', 'name', 'parent', 'path', 'depth',
+                  'bookmark_count', 'total_count', 'created_at']
+        read_only_fields = ['id', 'path', 'depth',
+                            'bookmark_count', 'total_count', 'created_at']
+
+    def validate_parent(self, value):
+        if self.instance is not None and value != self.instance.parent:
+            raise serializers.ValidationError(
+                "폴더 이동은 move 액션을 사용하세요."
+            )
+        request = self.context.get('request')
+        if value is not None and request is not None and value.owner_id != request.user.pk:
+            raise serializers.ValidationError(
+                "자신의 폴더 아래에만 만들 수 있습니다."
+            )
+        return value
+
+
+class CollectionMoveSerializer(serializers.Serializer):
+    """
+    폴더 이동 요청
+
+    - parent: 새 상위 폴더 id (null이면 최상위)
+    - 자신의 폴더만 지정 가능
+    """
+    parent = serializers.PrimaryKeyRelatedField(
+        queryset=Collection.objects.none(),
+        allow_null=True,
+        default=None,
+        error_messages={
+            'does_not_exist': '폴더를 찾을 수 없습니다.',
+            'incorrect_type': '폴더 id는 숫자여야 합니다.',
+        },
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None:
+            self.fields['parent'].queryset = Collection.objects.filter(owner=request.user)
+
+
 class UserSerializer(serializers.ModelSerializer):
     """
     사용자 조회용 Serializer
@@ -0,0 +1,117 @@
+# bookmarks/signals.py
+"""
+Bookmark 시그널 → 파생 데이터 갱신
+
+apps.py의 ready()에서 import해야 연결됨
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import autocomplete, collection_tree, events, feed, quotas, snapshots
+from .models import Bookmark, Follow, Snapshot
+
+
+@receiver(post_save, sender=Bookmark)
+def publish_bookmark_saved(sender, instance, created, **kwargs):
+    """
+    공개 북마크 이벤트 발행
+
+    - 공개 북마크 생성: created
+    - 공개 북마크 수정: updated
+    - 공개 ↔ 비공개 전환: visibility (비공개로 바뀌면 id만 보냄)
+    """
+    was_public = getattr(instance, '_loaded_is_public', instance.is_public)
+    instance._loaded_is_public = instance.is_public
+
+    if created:
+        if not instance.is_public:
+            return
+        event = 'created'
+        data = events.bookmark_payload(instance)
+    elif was_public != instance.is_public:
+        event = 'visibility'
+        if instance.is_public:
+            data = events.bookmark_payload(instance)
+        else:
+            data = {'id': instance.pk, 'is_public': False}
+    elif instance.is_public:
+        event = 'updated'
+        data = events.bookmark_payload(instance)
+    else:
+        return
+
+    # 롤백되면 발행하지 않음
+    transaction.on_commit(lambda: events.broker.publish(event, data))
+
+
+@receiver(post_delete, sender=Bookmark)
+def publish_bookmark_deleted(sender, instance, **kwargs):
+    if not getattr(instance, '_loaded_is_public', instance.is_public):
+        return
+    data = {'id': instance.pk}
+    transaction.on_commit(lambda: events.broker.publish('deleted', data))
+
+
+@receiver(post_delete, sender=Snapshot)
+def release_snapshot_content(sender, instance, **kwargs):
+    """
+    스냅샷이 지워지면(북마크 삭제로 CASCADE 포함) 내용 참조 해제
+    → 아무도 안 쓰는 내용/청크는 여기서 정리됨
+    """
+    snapshots.release_content(instance.content_id)
+
+
+@receiver(post_save, sender=Bookmark)
+def update_autocomplete_index(sender, instance, **kwargs):
+    transaction.on_commit(lambda: autocomplete.index.update(instance))
+
+
+@receiver(post_delete, sender=Bookmark)
+def remove_from_autocomplete_index(sender, instance, **kwargs):
+    bookmark_id = instance.pk
+    transaction.on_commit(lambda: autocomplete.index.remove(bookmark_id))
+
+
+@receiver(post_save, sender=Bookmark)
+def update_collection_counts(sender, instance, created, **kwargs):
+    """
+    폴더별 북마크 수 증감 (폴더 이동 포함)
+    """
+    if created:
+        old_collection_id = None
+    else:
+        old_collection_id = getattr(instance, '_loaded_collection_id', instance.collection_id)
+    instance._loaded_collection_id = instance.collection_id
+
+    if old_collection_id != instance.collection_id:
+        collection_tree.add_bookmarks(old_collection_id, -1)
+        collection_tree.add_bookmarks(instance.collection_id, 1)
+
+
+@receiver(post_delete, sender=Bookmark)
+def decrement_collection_counts(sender, instance, **kwargs):
+    collection_id = getattr(instance, '_loaded_collection_id', instance.collection_id)
+    collection_tree.add_bookmarks(collection_id, -1)
+
+
+@receiver(post_save, sender=Bookmark)
+def increment_quota_counter(sender, instance, created, **kwargs):
+    if created:
+        quotas.add(instance.owner_id, 1)
+
+
+@receiver(post_delete, sender=Bookmark)
+def decrement_quota_counter(sender, instance, **kwargs):
+    quotas.add(instance.owner_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def increment_follower_count(sender, instance, created, **kwargs):
+    if created:
+        feed.add_follower(instance.followee_id, 1)
+
+
+@receiver(post_delete, sender=Follow)
+def decrement_follower_count(sender, instance, **kwargs):
+    feed.add_follower(instance.followee_id, -1)
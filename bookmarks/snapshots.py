@@ -0,0 +1,487 @@
+# bookmarks/snapshots.py
+"""
+페이지 스냅샷 저장소 (content-addressed)
+
+구조:
+- PageContent: 페이지 전체의 sha256으로 식별 → 같은 페이지는 한 번만 저장
+- SnapshotChunk: 페이지를 내용 기준으로 자른 조각 → 비슷한 페이지끼리 조각 공유
+- 조각은 압축해서(zstd가 있으면 zstd, 없으면 zlib) 팩 파일에 이어 붙임
+- 읽을 때는 팩 파일을 mmap으로 열어서 필요한 부분만 잘라 읽음
+
+정리(GC):
+- 스냅샷이 지워지면(북마크 삭제 포함) PageContent.ref_count 감소
+- 0이 되면 PageContent 삭제 + 조각들의 ref_count 감소 → 0인 조각 삭제
+- 팩 파일 안의 죽은 공간은 compact_packs()로 회수
+  (python manage.py compact_snapshots)
+"""
+import hashlib
+import http.client
+import ipaddress
+import mmap
+import os
+import re
+import socket
+import ssl
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import PageContent, Snapshot, SnapshotChunk
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성
+    zstandard = None
+
+SNAPSHOT_ROOT = Path(getattr(settings, 'SNAPSHOT_ROOT', settings.BASE_DIR / 'snapshots'))
+SNAPSHOT_MAX_BYTES = getattr(settings, 'SNAPSHOT_MAX_BYTES', 5 * 1024 * 1024)
+SNAPSHOT_PACK_MAX_BYTES = getattr(settings, 'SNAPSHOT_PACK_MAX_BYTES', 64 * 1024 * 1024)
+# 페이지를 가져올 때 따라갈 리다이렉트 최대 횟수
+SNAPSHOT_MAX_REDIRECTS = getattr(settings, 'SNAPSHOT_MAX_REDIRECTS', 5)
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+# 팩 파일을 이 시간(초)만큼 쓰면 새 팩으로 넘어감
+# → 이보다 두 배 이상 수정되지 않은 팩만 compact 대상 (쓰는 중인 팩 보호)
+SNAPSHOT_PACK_ROTATE_SECONDS = getattr(settings, 'SNAPSHOT_PACK_ROTATE_SECONDS', 600)
+
+# 청크 크기 (content-defined chunking)
+MIN_CHUNK = 2 * 1024
+MAX_CHUNK = 64 * 1024
+# 경계 후보 중 약 1/8에서 자름
+BOUNDARY_MASK = 0x7
+BOUNDARY_WINDOW = 32
+BOUNDARY_RE = re.compile(rb'[\n>]')
+
+# 한 프로세스에서 열어 둘 mmap 최대 개수
+MMAP_CACHE_SIZE = 64
+
+
+class SnapshotError(Exception):
+    pass
+
+
+# ===== 청크 나누기 =====
+
+def split_chunks(data):
+    """
+    내용 기준으로 자르기
+
+    줄바꿈/'>' 뒤를 경계 후보로 보고, 직전 32바이트의 crc32로 자를지 결정
+    → 앞부분에 내용이 끼어들어도 뒷부분 경계는 그대로라서 중복 제거가 잘 됨
+    """
+    chunks = []
+    start = 0
+    for match in BOUNDARY_RE.finditer(data):
+        end = match.end()
+        size = end - start
+        if size < MIN_CHUNK:
+            continue
+        while size > MAX_CHUNK:
+            chunks.append(data[start:start + MAX_CHUNK])
+            start += MAX_CHUNK
+            size = end - start
+        window = data[max(start, end - BOUNDARY_WINDOW):end]
+        if size >= MIN_CHUNK and zlib.crc32(window) & BOUNDARY_MASK == 0:
+            chunks.append(data[start:end])
+            start = end
+    while len(data) - start > MAX_CHUNK:
+        chunks.append(data[start:start + MAX_CHUNK])
+        start += MAX_CHUNK
+    if start < len(data) or not chunks:
+        chunks.append(data[start:])
+    return chunks
+
+
+# ===== 압축 =====
+
+def compress(data):
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=3).compress(data)
+    return 'zlib', zlib.compress(data, 6)
+
+
+def decompress(codec, data):
+    if codec == 'zlib':
+        return zlib.decompress(data)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise SnapshotError('zstandard 패키지가 필요합니다.')
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise SnapshotError(f'알 수 없는 압축 방식: {codec}')
+
+
+# ===== 팩 파일 =====
+
+class PackWriter:
+    """
+    프로세스마다 자기 팩 파일에만 씀 → 프로세스 간 파일 잠금 불필요
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._name = None
+        self._started = 0
+
+    def _rotate(self):
+        self._name = f'pack-{int(time.time())}-{os.getpid()}-{uuid.uuid4().hex[:8]}.pack'
+        self._started = time.monotonic()
+
+    def append(self, data):
+        """
+        반환: (팩 이름, offset)
+        """
+        return self.append_many([data])[0]
+
+    def append_many(self, payloads):
+        """
+        여러 조각을 이어 붙이고 fsync는 팩 파일마다 한 번만
+
+        반환: [(팩 이름, offset), ...] (payloads 순서대로)
+        """
+        locations = []
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            f = None
+            try:
+                for data in payloads:
+                    if f is not None:
+                        size = f.tell()
+                    elif self._name and (self.root / self._name).exists():
+                        size = (self.root / self._name).stat().st_size
+                    else:
+                        size = 0
+                    if (
+                        self._name is None
+                        or time.monotonic() - self._started > SNAPSHOT_PACK_ROTATE_SECONDS
+                        or (size and size + len(data) > SNAPSHOT_PACK_MAX_BYTES)
+                    ):
+                        if f is not None:
+                            self._sync(f)
+                            f.close()
+                            f = None
+                        self._rotate()
+                    if f is None:
+                        f = open(self.root / self._name, 'ab')
+                    locations.append((self._name, f.tell()))
+                    f.write(data)
+                if f is not None:
+                    self._sync(f)
+            finally:
+                if f is not None:
+                    f.close()
+        return locations
+
+    @staticmethod
+    def _sync(f):
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class PackReader:
+    """
+    팩 파일 mmap 캐시 (LRU)
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._maps = OrderedDict()
+
+    def read(self, pack, offset, length):
+        with self._lock:
+            mm = self._maps.get(pack)
+            if mm is not None and offset + length > len(mm):
+                # 매핑 이후에 파일이 커짐 → 다시 매핑
+                self._close(pack)
+                mm = None
+            if mm is None:
+                with open(self.root / pack, 'rb') as f:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[pack] = mm
+                while len(self._maps) > MMAP_CACHE_SIZE:
+                    self._close(next(iter(self._maps)))
+            self._maps.move_to_end(pack)
+            return mm[offset:offset + length]
+
+    def _close(self, pack):
+        mm = self._maps.pop(pack, None)
+        if mm is not None:
+            mm.close()
+
+    def forget(self, pack):
+        with self._lock:
+            self._close(pack)
+
+
+pack_writer = PackWriter(SNAPSHOT_ROOT / 'packs')
+pack_reader = PackReader(SNAPSHOT_ROOT / 'packs')
+
+
+# ===== 저장 / 읽기 =====
+
+def store_content(data):
+    """
+    내용 저장 후 PageContent 반환 (ref_count 1 증가)
+
+    같은 내용이 이미 있으면 청크를 다시 쓰지 않음
+    팩 파일 쓰기(fsync)는 트랜잭션 밖에서 먼저 끝냄 → SQLite 쓰기 잠금을 오래 잡지 않음
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    chunks = split_chunks(data)
+    chunk_digests = [hashlib.sha256(chunk).hexdigest() for chunk in chunks]
+    unique = dict(zip(chunk_digests, chunks))
+
+    written = {}
+    if not PageContent.objects.filter(digest=digest).exists():
+        existing = set(
+            SnapshotChunk.objects.filter(digest__in=unique).values_list('digest', flat=True)
+        )
+        written = _write_chunks({d: c for d, c in unique.items() if d not in existing})
+
+    with transaction.atomic():
+        content, created = PageContent.objects.get_or_create(
+            digest=digest,
+            defaults={'size': len(data), 'manifest': ' '.join(chunk_digests)},
+        )
+        if created:
+            existing = set(
+                SnapshotChunk.objects.filter(digest__in=unique)
+                .values_list('digest', flat=True)
+            )
+            # 확인한 뒤 GC로 지워진 조각만 여기서 씀 (드문 경우)
+            missing = {
+                d: c for d, c in unique.items() if d not in existing and d not in written
+            }
+            if missing:
+                written.update(_write_chunks(missing))
+            new_chunks = [chunk for d, chunk in written.items() if d not in existing]
+            # 다른 프로세스가 먼저 넣었으면 무시 (팩에 남은 바이트는 compact 때 회수)
+            SnapshotChunk.objects.bulk_create(new_chunks, ignore_conflicts=True)
+            SnapshotChunk.objects.filter(digest__in=unique).update(
+                ref_count=F('ref_count') + 1
+            )
+        PageContent.objects.filter(pk=content.pk).update(ref_count=F('ref_count') + 1)
+    return content
+
+
+def _write_chunks(chunks):
+    """
+    {digest: 조각} 압축해서 팩에 쓰기
+    반환: {digest: 저장 안 된 SnapshotChunk}
+    """
+    compressed = {digest: compress(chunk) for digest, chunk in chunks.items()}
+    locations = pack_writer.append_many([payload for _, payload in compressed.values()])
+    return {
+        digest: SnapshotChunk(
+            digest=digest, pack=pack, offset=offset,
+            length=len(payload), size=len(chunks[digest]), codec=codec,
+        )
+        for (digest, (codec, payload)), (pack, offset) in zip(compressed.items(), locations)
+    }
+
+
+def release_content(content_id):
+    """
+    PageContent 참조 하나 해제, 더 이상 안 쓰이면 청크까지 정리
+    """
+    with transaction.atomic():
+        PageContent.objects.filter(pk=content_id).update(ref_count=F('ref_count') - 1)
+        content = PageContent.objects.filter(pk=content_id, ref_count=0).first()
+        if content is None or content.snapshots.exists():
+            return False
+        chunk_digests = set(content.manifest.split())
+        content.delete()
+        SnapshotChunk.objects.filter(digest__in=chunk_digests).update(
+            ref_count=F('ref_count') - 1
+        )
+        SnapshotChunk.objects.filter(digest__in=chunk_digests, ref_count=0).delete()
+    return True
+
+
+def iter_content(content):
+    """
+    PageContent 내용을 청크 단위로 (압축 풀어서) 내보냄
+    """
+    chunk_digests = content.manifest.split()
+    chunks = SnapshotChunk.objects.in_bulk(chunk_digests, field_name='digest')
+    for chunk_digest in chunk_digests:
+        chunk = chunks[chunk_digest]
+        try:
+            payload = pack_reader.read(chunk.pack, chunk.offset, chunk.length)
+        except FileNotFoundError:
+            # 그 사이 compact로 옮겨졌을 수 있음 → 위치 다시 조회
+            chunk = SnapshotChunk.objects.get(digest=chunk_digest)
+            payload = pack_reader.read(chunk.pack, chunk.offset, chunk.length)
+        yield decompress(chunk.codec, payload)
+
+
+def read_content(content):
+    return b''.join(iter_content(content))
+
+
+def save_snapshot(bookmark, data, content_type='text/html'):
+    """
+    북마크 스냅샷 저장 (기존 스냅샷은 교체)
+    """
+    if len(data) > SNAPSHOT_MAX_BYTES:
+        raise SnapshotError('페이지가 너무 큽니다.')
+    with transaction.atomic():
+        content = store_content(data)
+        snapshot = Snapshot.objects.select_for_update().filter(bookmark=bookmark).first()
+        if snapshot is None:
+            return Snapshot.objects.create(
+                bookmark=bookmark, content=content, content_type=content_type
+            )
+        old_content_id = snapshot.content_id
+        snapshot.content = content
+        snapshot.content_type = content_type
+        snapshot.save()
+        release_content(old_content_id)
+    return snapshot
+
+
+# ===== 페이지 가져오기 =====
+
+def _resolve_public_host(host):
+    """
+    내부망 주소로의 요청 차단 (SSRF 방지)
+
+    반환: 검사를 통과한 주소 하나 - 실제 연결도 이 주소로 함
+    (연결할 때 DNS를 다시 조회하면 그사이 내부 주소로 바뀔 수 있음)
+    """
+    try:
+        infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError) as e:
+        raise SnapshotError('호스트를 찾을 수 없습니다.') from e
+    addresses = []
+    for info in infos:
+        # fe80::1%eth0 같은 범위 지정 IPv6 주소는 % 앞부분만
+        address = ipaddress.ip_address(info[4][0].split('%', 1)[0])
+        if not address.is_global:
+            raise SnapshotError('내부 주소는 저장할 수 없습니다.')
+        addresses.append(str(address))
+    if not addresses:
+        raise SnapshotError('호스트를 찾을 수 없습니다.')
+    return addresses[0]
+
+
+class _PinnedHTTPConnection(http.client.HTTPConnection):
+    """Host 헤더는 원래 호스트 이름, 연결은 검사한 주소로"""
+
+    def __init__(self, host, address, **kwargs):
+        super().__init__(host, **kwargs)
+        self.address = address
+
+    def connect(self):
+        self.sock = socket.create_connection((self.address, self.port), self.timeout)
+
+
+class _PinnedHTTPSConnection(http.client.HTTPSConnection):
+    """인증서 확인(SNI)은 원래 호스트 이름, 연결은 검사한 주소로"""
+
+    def __init__(self, host, address, **kwargs):
+        self.ssl_context = ssl.create_default_context()
+        super().__init__(host, context=self.ssl_context, **kwargs)
+        self.address = address
+
+    def connect(self):
+        sock = socket.create_connection((self.address, self.port), self.timeout)
+        self.sock = self.ssl_context.wrap_socket(sock, server_hostname=self.host)
+
+
+def fetch_page(url, timeout=10):
+    """
+    반환: (내용 bytes, content_type)
+
+    리다이렉트는 직접 따라가면서 주소마다 다시 검사
+    (공개 주소가 내부 주소로 리다이렉트하는 경우 차단)
+    """
+    for _ in range(SNAPSHOT_MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise SnapshotError('http(s) 주소만 저장할 수 있습니다.')
+        address = _resolve_public_host(parts.hostname)
+        connection_class = (
+            _PinnedHTTPSConnection if parts.scheme == 'https' else _PinnedHTTPConnection
+        )
+        path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+
+        try:
+            connection = connection_class(
+                parts.hostname, address, port=parts.port, timeout=timeout
+            )
+            try:
+                connection.request('GET', path, headers={
+                    'User-Agent': 'bookmarkhero-snapshot/1.0',
+                })
+                response = connection.getresponse()
+                if response.status in REDIRECT_STATUSES:
+                    location = response.getheader('Location')
+                    if not location:
+                        raise SnapshotError('리다이렉트 주소가 없습니다.')
+                    url = urljoin(url, location)
+                    continue
+                if response.status >= 400:
+                    raise SnapshotError(f'페이지를 가져올 수 없습니다: HTTP {response.status}')
+                data = response.read(SNAPSHOT_MAX_BYTES + 1)
+                content_type = response.headers.get_content_type()
+            finally:
+                connection.close()
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            raise SnapshotError(f'페이지를 가져올 수 없습니다: {e}') from e
+
+        if len(data) > SNAPSHOT_MAX_BYTES:
+            raise SnapshotError('페이지가 너무 큽니다.')
+        return data, content_type
+
+    raise SnapshotError('리다이렉트가 너무 많습니다.')
+
+
+# ===== 팩 정리 =====
+
+def compact_packs(min_live_ratio=0.5):
+    """
+    살아있는 청크 비율이 낮은 팩을 새 팩으로 옮기고 삭제
+
+    최근에 쓰인 팩(다른 프로세스가 쓰는 중일 수 있음)은 건드리지 않음
+    반환: 삭제한 팩 수
+    """
+    pack_dir = SNAPSHOT_ROOT / 'packs'
+    if not pack_dir.exists():
+        return 0
+
+    live = dict(
+        SnapshotChunk.objects.values('pack')
+        .annotate(live=Sum('length'))
+        .values_list('pack', 'live')
+    )
+    cutoff = time.time() - SNAPSHOT_PACK_ROTATE_SECONDS * 2
+    removed = 0
+    for path in pack_dir.glob('*.pack'):
+        stat = path.stat()
+        if stat.st_mtime > cutoff:
+            continue
+        live_bytes = live.get(path.name, 0)
+        if stat.st_size and live_bytes / stat.st_size >= min_live_ratio:
+            continue
+
+        with transaction.atomic():
+            moved = list(SnapshotChunk.objects.filter(pack=path.name))
+            payloads = [
+                pack_reader.read(chunk.pack, chunk.offset, chunk.length) for chunk in moved
+            ]
+            for chunk, (pack, offset) in zip(moved, pack_writer.append_many(payloads)):
+                chunk.pack, chunk.offset = pack, offset
+            SnapshotChunk.objects.bulk_update(moved, ['pack', 'offset'], batch_size=500)
+        pack_reader.forget(path.name)
+        path.unlink()
+        removed += 1
+    return removed
@@ -0,0 +1,372 @@
+# bookmarks/taskqueue.py
+"""
+로컬 작업 큐 (외부 브로커 없이 SQLite 파일 하나)
+
+실무 팁:
+- 요청 처리 중 오래 걸리는 일(피드 팬아웃, 계정 삭제, 토큰 정리)은 큐에 넣고 바로 응답
+- 큐는 메인 DB와 다른 SQLite 파일(TASKQUEUE_DB_PATH) → 북마크 쓰기 잠금과 경쟁하지 않음
+- 워커: python manage.py run_worker --processes 4
+
+기능:
+- 우선순위(priority 큰 것 먼저), 예약 실행(run_at)
+- 중복 제거: 같은 dedup_key인 대기 중 작업은 하나만
+- 실패 시 지수 백오프로 재시도, max_retries를 넘으면 failed
+- batch=True 작업은 같은 이름의 대기 작업을 묶어서 한 번에 실행
+- 실행 중인 작업은 워커가 주기적으로 heartbeat_at을 갱신
+  → 갱신이 TASKQUEUE_VISIBILITY_TIMEOUT 넘게 끊긴 작업(워커가 죽음)만 다시 대기열로
+  (오래 걸리는 작업이 실행 중에 다른 워커에게 또 가지 않음)
+
+사용:
+    @task('feed.sync', batch=True)
+    def sync_feeds(calls):        # batch 작업은 [(args, kwargs), ...]를 받음
+        ...
+
+    sync_feeds.delay(bookmark_id, dedup_key=f'feed_sync:{bookmark_id}')
+"""
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+TASKQUEUE_DB_PATH = getattr(settings, 'TASKQUEUE_DB_PATH', settings.BASE_DIR / 'tasks.sqlite3')
+# True면 큐에 넣지 않고 (커밋 후) 바로 실행 - 테스트/워커 없이 개발할 때
+TASKQUEUE_ALWAYS_EAGER = getattr(settings, 'TASKQUEUE_ALWAYS_EAGER', False)
+TASKQUEUE_VISIBILITY_TIMEOUT = getattr(settings, 'TASKQUEUE_VISIBILITY_TIMEOUT', 300)
+# 실행 중 작업의 heartbeat 갱신 간격(초)
+TASKQUEUE_HEARTBEAT_INTERVAL = TASKQUEUE_VISIBILITY_TIMEOUT / 3
+# 완료된 작업 기록 보관 시간(초) - 지연 시간 통계에 사용
+TASKQUEUE_RETENTION = getattr(settings, 'TASKQUEUE_RETENTION', 24 * 60 * 60)
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    dedup_key TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_retries INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL,
+    worker TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, run_at, id);
+CREATE INDEX IF NOT EXISTS jobs_name ON jobs (status, name, priority DESC, id);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_dedup ON jobs (dedup_key)
+    WHERE dedup_key IS NOT NULL AND status = 'queued';
+'''
+
+registry = {}
+
+
+class Task:
+    def __init__(self, func, name, batch=False, batch_size=100,
+                 max_retries=5, backoff=2.0, priority=0):
+        self.func = func
+        self.name = name
+        self.batch = batch
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.priority = priority
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, dedup_key=None, priority=None, countdown=0, **kwargs):
+        """
+        큐에 넣기 (현재 트랜잭션이 커밋된 뒤)
+        """
+        def enqueue():
+            if TASKQUEUE_ALWAYS_EAGER:
+                self.run([(args, kwargs)])
+            else:
+                queue.enqueue(
+                    self.name, args, kwargs, dedup_key=dedup_key,
+                    priority=self.priority if priority is None else priority,
+                    countdown=countdown, max_retries=self.max_retries,
+                )
+        transaction.on_commit(enqueue)
+
+    def run(self, calls):
+        """calls: [(args, kwargs), ...]"""
+        if self.batch:
+            return self.func(calls)
+        for args, kwargs in calls:
+            self.func(*args, **kwargs)
+
+
+def task(name, **options):
+    def decorator(func):
+        registry[name] = Task(func, name, **options)
+        return registry[name]
+    return decorator
+
+
+class TaskQueue:
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+            if 'heartbeat_at' not in columns:
+                # heartbeat 추가 전에 만든 큐 파일
+                conn.execute('ALTER TABLE jobs ADD COLUMN heartbeat_at REAL')
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def enqueue(self, name, args=(), kwargs=None, dedup_key=None, priority=0,
+                countdown=0, max_retries=None):
+        """
+        반환: 작업 id (같은 dedup_key가 이미 대기 중이면 None)
+        """
+        if max_retries is None:
+            max_retries = registry[name].max_retries if name in registry else 5
+        now = time.time()
+        payload = json.dumps({'args': list(args), 'kwargs': kwargs or {}})
+        cursor = self._connection().execute(
+            'INSERT OR IGNORE INTO jobs (name, payload, priority, dedup_key, status, '
+            'max_retries, run_at, enqueued_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (name, payload, priority, dedup_key, STATUS_QUEUED,
+             max_retries, now + countdown, now),
+        )
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def claim(self, worker, batch_sizes=None):
+        """
+        실행할 작업 가져오기
+
+        - 우선순위가 가장 높은 준비된 작업 하나를 고르고
+        - 그 작업이 batch 작업이면 같은 이름의 준비된 작업을 batch_size개까지 함께
+        반환: 작업 행 리스트 (없으면 빈 리스트)
+        """
+        batch_sizes = batch_sizes or {}
+        now = time.time()
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # 워커가 죽어서 running으로 남은 작업 되살리기
+            # 같은 dedup_key 작업이 그사이 새로 들어왔으면 되살리지 않고 끝냄 (새 작업이 대신 실행)
+            stale = now - TASKQUEUE_VISIBILITY_TIMEOUT
+            conn.execute(
+                'UPDATE OR IGNORE jobs SET status = ? '
+                'WHERE status = ? AND COALESCE(heartbeat_at, started_at) < ?',
+                (STATUS_QUEUED, STATUS_RUNNING, stale),
+            )
+            conn.execute(
+                'UPDATE jobs SET status = ?, finished_at = ?, error = ? '
+                'WHERE status = ? AND COALESCE(heartbeat_at, started_at) < ?',
+                (STATUS_DONE, now, '중단됨 (같은 dedup_key 작업이 대기 중)', STATUS_RUNNING, stale),
+            )
+            head = conn.execute(
+                'SELECT name FROM jobs WHERE status = ? AND run_at <= ? '
+                'ORDER BY priority DESC, run_at, id LIMIT 1',
+                (STATUS_QUEUED, now),
+            ).fetchone()
+            if head is None:
+                conn.execute('COMMIT')
+                return []
+            limit = batch_sizes.get(head['name'], 1)
+            rows = conn.execute(
+                'UPDATE jobs SET status = ?, started_at = ?, heartbeat_at = ?, worker = ?, '
+                'attempts = attempts + 1 WHERE id IN ('
+                '  SELECT id FROM jobs WHERE status = ? AND name = ? AND run_at <= ?'
+                '  ORDER BY priority DESC, id LIMIT ?'
+                ') RETURNING *',
+                (STATUS_RUNNING, now, now, worker, STATUS_QUEUED, head['name'], now, limit),
+            ).fetchall()
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return rows
+
+    def heartbeat(self, ids):
+        """실행 중인 작업이 아직 살아 있음을 기록"""
+        self._connection().executemany(
+            'UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ?',
+            [(time.time(), job_id, STATUS_RUNNING) for job_id in ids],
+        )
+
+    def complete(self, ids):
+        now = time.time()
+        conn = self._connection()
+        conn.executemany(
+            'UPDATE jobs SET status = ?, finished_at = ?, error = NULL WHERE id = ?',
+            [(STATUS_DONE, now, job_id) for job_id in ids],
+        )
+        if random.random() < 0.01:
+            conn.execute(
+                'DELETE FROM jobs WHERE status = ? AND finished_at < ?',
+                (STATUS_DONE, now - TASKQUEUE_RETENTION),
+            )
+
+    def fail(self, rows, error, backoff=2.0):
+        """
+        재시도 가능하면 backoff^attempts초(+지터) 뒤로 다시 예약, 아니면 failed
+        """
+        now = time.time()
+        conn = self._connection()
+        for row in rows:
+            if row['attempts'] <= row['max_retries']:
+                delay = backoff ** row['attempts'] * (1 + random.random() * 0.1)
+                # 같은 dedup_key가 그 사이 새로 들어왔으면 이 작업은 포기 (새 작업이 대신 실행)
+                conn.execute(
+                    'UPDATE OR IGNORE jobs SET status = ?, run_at = ?, error = ? WHERE id = ?',
+                    (STATUS_QUEUED, now + delay, error, row['id']),
+                )
+                conn.execute(
+                    'UPDATE jobs SET status = ?, finished_at = ?, error = ? '
+                    'WHERE id = ? AND status = ?',
+                    (STATUS_DONE, now, error, row['id'], STATUS_RUNNING),
+                )
+            else:
+                conn.execute(
+                    'UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?',
+                    (STATUS_FAILED, now, error, row['id']),
+                )
+
+    def metrics(self, window=300):
+        """
+        큐 상태와 최근 window초 동안의 지연 시간
+
+        - depth: 상태별 작업 수, 작업 이름별 대기 수
+        - oldest_queued_seconds: 가장 오래 기다린 준비된 작업의 대기 시간
+        - wait_*: 넣은 뒤 실행 시작까지 걸린 시간
+        - run_*: 실행 시간
+        """
+        now = time.time()
+        conn = self._connection()
+        depth = {
+            row['status']: row['n'] for row in conn.execute(
+                'SELECT status, COUNT(*) AS n FROM jobs GROUP BY status'
+            )
+        }
+        queued_by_name = {
+            row['name']: row['n'] for row in conn.execute(
+                'SELECT name, COUNT(*) AS n FROM jobs WHERE status = ? GROUP BY name',
+                (STATUS_QUEUED,),
+            )
+        }
+        oldest = conn.execute(
+            'SELECT MIN(run_at) AS t FROM jobs WHERE status = ? AND run_at <= ?',
+            (STATUS_QUEUED, now),
+        ).fetchone()['t']
+        recent = conn.execute(
+            'SELECT started_at - MAX(enqueued_at, run_at) AS wait, '
+            'finished_at - started_at AS run FROM jobs '
+            'WHERE status = ? AND finished_at >= ?',
+            (STATUS_DONE, now - window),
+        ).fetchall()
+        waits = sorted(row['wait'] for row in recent)
+        runs = sorted(row['run'] for row in recent)
+
+        def percentile(values, p):
+            if not values:
+                return None
+            return round(values[min(len(values) - 1, int(len(values) * p))], 4)
+
+        return {
+            'depth': {status: depth.get(status, 0) for status in
+                      (STATUS_QUEUED, STATUS_RUNNING, STATUS_DONE, STATUS_FAILED)},
+            'queued_by_name': queued_by_name,
+            'oldest_queued_seconds': round(now - oldest, 3) if oldest else 0,
+            'window_seconds': window,
+            'completed': len(recent),
+            'wait_p50': percentile(waits, 0.5),
+            'wait_p95': percentile(waits, 0.95),
+            'run_p50': percentile(runs, 0.5),
+            'run_p95': percentile(runs, 0.95),
+        }
+
+
+queue = TaskQueue(TASKQUEUE_DB_PATH)
+
+
+class Heartbeat(threading.Thread):
+    """작업이 실행되는 동안 별도 스레드에서 heartbeat 갱신"""
+
+    def __init__(self, ids, interval=None):
+        super().__init__(name='taskqueue-heartbeat', daemon=True)
+        self.ids = ids
+        self.interval = interval or TASKQUEUE_HEARTBEAT_INTERVAL
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                queue.heartbeat(self.ids)
+        finally:
+            queue.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.join()
+
+
+def run_once(worker='inline'):
+    """
+    작업 한 묶음 실행
+
+    반환: 실행한 작업 수 (0이면 큐가 비어 있음)
+    """
+    batch_sizes = {name: t.batch_size for name, t in registry.items() if t.batch}
+    rows = queue.claim(worker, batch_sizes)
+    if not rows:
+        return 0
+
+    name = rows[0]['name']
+    current = registry.get(name)
+    if current is None:
+        queue.fail(rows, f'등록되지 않은 작업: {name}')
+        return len(rows)
+
+    calls = []
+    for row in rows:
+        payload = json.loads(row['payload'])
+        calls.append((tuple(payload['args']), payload['kwargs']))
+    try:
+        with Heartbeat([row['id'] for row in rows]):
+            current.run(calls)
+    except Exception:
+        logger.exception('작업 실패: %s', name)
+        queue.fail(rows, traceback.format_exc(limit=5), current.backoff)
+    else:
+        queue.complete([row['id'] for row in rows])
+    return len(rows)
@@ -0,0 +1,37 @@
+# bookmarks/tasks.py
+"""
+큐에서 실행할 작업 목록 (bookmarks/taskqueue.py)
+
+워커 실행: python manage.py run_worker --processes 4
+"""
+from django.conf import settings
+from django.core.management import call_command
+
+from . import feed, purge
+from .taskqueue import task
+
+# 로그아웃 후 만료 토큰 정리까지 기다리는 시간(초) - 그사이 로그아웃은 한 작업으로 합쳐짐
+TOKEN_FLUSH_DELAY = getattr(settings, 'TOKEN_FLUSH_DELAY', 60 * 60)
+
+
+@task('feed.sync', batch=True, batch_size=50, priority=10)
+def sync_feeds(calls):
+    """
+    북마크의 현재 공개 여부에 맞춰 팔로워 피드 반영 (공개 → 팬아웃, 비공개 → 제거)
+
+    여러 북마크를 한 번에 받아서 처리 (같은 북마크가 두 번 오면 한 번만)
+    """
+    for bookmark_id in dict.fromkeys(args[0] for args, _ in calls):
+        feed.sync_bookmark(bookmark_id)
+
+
+@task('accounts.purge', max_retries=3, priority=-10)
+def purge_account(purge_id):
+    """탈퇴 계정 데이터 삭제 (오래 걸리므로 우선순위 낮게)"""
+    purge.run_purge(purge_id)
+
+
+@task('auth.flush_expired_tokens', max_retries=1, priority=-20)
+def flush_expired_tokens():
+    """만료된 refresh token 기록 정리 (simplejwt 관리 명령)"""
+    call_command('flushexpiredtokens', verbosity=0)
@@ -1,3 +1,1014 @@
-from django.test import TestCase
+import asyncio
+import http.server
+import io
+import itertools
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import (
+    autocomplete, bulk, collection_tree, events, feed, purge, quotas, renderers,
+    snapshots, taskqueue, throttling, visits,
+)
+from .models import (
+    AccountPurge, Bookmark, BookmarkQuota, BookmarkStats, Collection, FeedEntry, Follow,
+    FollowStats, PageContent, Snapshot, SnapshotChunk,
+)
+
+_urls = itertools.count(1)
+
+
+def make_bookmark(owner, **kwargs):
+    n = next(_urls)
+    fields = {
+        'title': f'bookmark {n}',
+        'url': f'https://example.com/{n}',
+        'description': '설명',
+        'is_public': True,
+    }
+    fields.update(kwargs)
+    return Bookmark.objects.create(owner=owner, **fields)
+
+
+class IsolatedTestCase(APITestCase):
+    """
+    프로세스 밖에 상태를 두는 저장소(작업 큐, 요청 제한)를 테스트마다 임시 파일로
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+        self.queue = taskqueue.TaskQueue(f'{self.tmp}/tasks.sqlite3')
+        self.addCleanup(self.queue.close)
+        self._patch(taskqueue, 'queue', self.queue)
+
+        self.throttle_store = throttling.TokenBucketStore(f'{self.tmp}/ratelimit.sqlite3')
+        self._patch(throttling, 'store', self.throttle_store)
+
+    def _patch(self, target, attribute, value):
+        patcher = mock.patch.object(target, attribute, value)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_queue(self):
+        total = 0
+        while done := taskqueue.run_once('test'):
+            total += done
+        return total
+
+
+class FeedTests(IsolatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.reader = User.objects.create_user('reader')
+        self.author = User.objects.create_user('author')
+        Follow.objects.create(follower=self.reader, followee=self.author)
+
+    def test_keyset_pages_cover_feed_once_in_order(self):
+        bookmarks = [make_bookmark(self.author) for _ in range(5)]
+        for bookmark in bookmarks:
+            feed.fan_out_bookmark(bookmark.pk)
+
+        seen, cursor = [], None
+        while True:
+            page, next_cursor = feed.get_feed_page(
+                self.reader, feed.decode_cursor(cursor) if cursor else None, page_size=2
+            )
+            seen += [bookmark.pk for bookmark in page]
+            if next_cursor is None:
+                break
+            cursor = next_cursor
+
+        self.assertEqual(seen, [bookmark.pk for bookmark in reversed(bookmarks)])
+
+    def test_celebrity_bookmarks_are_merged_on_read(self):
+        celebrity = User.objects.create_user('celebrity')
+        fan = User.objects.create_user('fan')
+        Follow.objects.create(follower=self.reader, followee=celebrity)
+        Follow.objects.create(follower=fan, followee=celebrity)
+
+        with mock.patch.object(feed, 'FEED_FANOUT_MAX_FOLLOWERS', 1):
+            first = make_bookmark(self.author)
+            feed.fan_out_bookmark(first.pk)
+            loud = make_bookmark(celebrity)
+            self.assertEqual(feed.fan_out_bookmark(loud.pk), 0)
+            last = make_bookmark(self.author)
+            feed.fan_out_bookmark(last.pk)
+
+            page, _ = feed.get_feed_page(self.reader)
+
+        self.assertFalse(FeedEntry.objects.filter(bookmark=loud).exists())
+        self.assertEqual([b.pk for b in page], [last.pk, loud.pk, first.pk])
+
+    def test_private_bookmarks_are_not_fanned_out(self):
+        bookmark = make_bookmark(self.author, is_public=False)
+        self.assertEqual(feed.fan_out_bookmark(bookmark.pk), 0)
+        self.assertEqual(feed.get_feed_page(self.reader)[0], [])
+
+    def test_invalid_cursor_returns_400(self):
+        self.client.force_authenticate(self.reader)
+        response = self.client.get('/api/bookmarks/feed/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_out_of_range_cursor_id_returns_400(self):
+        self.client.force_authenticate(self.reader)
+        cursor = feed.encode_cursor(timezone.now(), 99999999999999999999999)
+        response = self.client.get('/api/bookmarks/feed/', {'cursor': cursor})
+        self.assertEqual(response.status_code, 400)
+
+    def test_follower_counter_follows_follow_and_unfollow(self):
+        self.assertEqual(feed.follower_count(self.author.pk), 1)
+        fan = User.objects.create_user('fan')
+        self.client.force_authenticate(fan)
+
+        self.client.post(f'/api/users/{self.author.pk}/follow/')
+        self.assertEqual(feed.follower_count(self.author.pk), 2)
+        self.client.post(f'/api/users/{self.author.pk}/unfollow/')
+        self.assertEqual(feed.follower_count(self.author.pk), 1)
+
+        # 팔로워가 탈퇴해도 카운터가 맞음, 팔로이 삭제 중에 카운터가 다시 생기지 않음
+        self.reader.delete()
+        self.assertEqual(feed.follower_count(self.author.pk), 0)
+        author_id = self.author.pk
+        self.author.delete()
+        self.assertFalse(FollowStats.objects.filter(user_id=author_id).exists())
+
+
+def collect(stream, count):
+    """async generator에서 count개만 받고 닫기"""
+    async def run():
+        items = []
+        async for item in stream:
+            items.append(item)
+            if len(items) >= count:
+                break
+        await stream.aclose()
+        return items
+    return asyncio.run(run())
+
+
+class EventStreamTests(IsolatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.broker = events.EventBroker(buffer_size=3)
+        self._patch(events, 'broker', self.broker)
+
+    def test_replays_events_after_last_event_id(self):
+        for n in range(3):
+            self.broker.publish('created', {'id': n})
+
+        items = collect(events.stream(self.broker.event_id(1), heartbeat=0.01), 3)
+
+        self.assertEqual(items[0], 'retry: 3000\n\n')
+        self.assertIn(f'id: {self.broker.event_id(2)}\n', items[1])
+        self.assertIn('data: {"id": 1}', items[1])
+        self.assertIn(f'id: {self.broker.event_id(3)}\n', items[2])
+
+    def test_id_from_another_process_gets_reset(self):
+        self.broker.publish('created', {'id': 1})
+        other = events.EventBroker()
+
+        items = collect(events.stream(other.event_id(1), heartbeat=0.01), 2)
+
+        self.assertIn('event: reset\n', items[1])
+        self.assertIn(f'id: {self.broker.event_id(1)}\n', items[1])
+
+    def test_reconnect_after_reset_does_not_reset_again(self):
+        self.broker.publish('created', {'id': 1})
+        items = collect(events.stream(events.EventBroker().event_id(1), heartbeat=0.01), 2)
+        resume = items[1].split('\n')[0].removeprefix('id: ')
+
+        items = collect(events.stream(resume, heartbeat=0.01), 2)
+
+        self.assertEqual(items[1], ': keep-alive\n\n')
+
+    def test_unknown_sequence_gets_reset(self):
+        items = collect(events.stream(self.broker.event_id(99), heartbeat=0.01), 2)
+        self.assertIn('event: reset\n', items[1])
+
+    def test_overflowed_buffer_gets_reset(self):
+        for n in range(6):
+            self.broker.publish('created', {'id': n})
+
+        items = collect(events.stream(self.broker.event_id(1), heartbeat=0.01), 3)
+
+        # 놓친 뒤 남은 이벤트는 건너뛰고 최신 순번으로 이동
+        self.assertIn('event: reset\n', items[1])
+        self.assertIn(f'id: {self.broker.event_id(6)}\n', items[1])
+        self.assertEqual(items[2], ': keep-alive\n\n')
+
+    async def test_stream_is_not_gzipped(self):
+        response = await self.async_client.get(
+            '/api/bookmarks/stream/', headers={'Accept-Encoding': 'gzip'}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        first = await anext(aiter(response.streaming_content))
+        self.assertEqual(first, b'retry: 3000\n\n')
+        await response.streaming_content.aclose()
+
+    def test_new_connection_starts_after_latest_event(self):
+        self.broker.publish('created', {'id': 1})
+        items = collect(events.stream(None, heartbeat=0.01), 2)
+        self.assertEqual(items[1], ': keep-alive\n\n')
+
+    def test_bookmark_signals_publish_events(self):
+        owner = User.objects.create_user('owner')
+        with self.captureOnCommitCallbacks(execute=True):
+            bookmark = make_bookmark(owner)
+            bookmark.is_public = False
+            bookmark.save()
+            private = make_bookmark(owner, is_public=False)
+            private.delete()
+
+        published = [event for _, event, _ in self.broker.events_after(0)[0]]
+        self.assertEqual(published, ['created', 'visibility'])
+
+
+def from_columnar(table):
+    """컬럼 방식 JSON → 행 리스트 (클라이언트 디코딩 방법 그대로)"""
+    columns = {}
+    for name in table['columns']:
+        column = table['data'][name]
+        if isinstance(column, dict) and 'prefix_dict' in column:
+            values = [
+                column['prefix_dict'][code] + suffix
+                for code, suffix in zip(column['codes'], column['suffix'])
+            ]
+        elif isinstance(column, dict):
+            values = [column['dict'][code] for code in column['codes']]
+        else:
+            values = column
+        columns[name] = values
+    return [
+        {name: columns[name][i] for name in table['columns']}
+        for i in range(table['length'])
+    ]
+
+
+class RendererTests(IsolatedTestCase):
+    def setUp(self):
+        super().setUp()
+        owner = User.objects.create_user('owner')
+        for _ in range(8):
+            make_bookmark(owner)
+
+    def test_columnar_round_trip_matches_json(self):
+        plain = self.client.get('/api/bookmarks/').json()
+        columnar = self.client.get('/api/bookmarks/', {'format': 'columnar'})
+
+        self.assertEqual(columnar['Content-Type'], renderers.ColumnarJSONRenderer.media_type)
+        body = columnar.json()
+        self.assertEqual(body['count'], plain['count'])
+        self.assertEqual(from_columnar(body['results']), plain['results'])
+        # 같은 도메인 URL은 접두어 테이블로
+        self.assertEqual(body['results']['data']['url']['prefix_dict'], ['https://example.com'])
+
+    def test_columnar_leaves_detail_responses_alone(self):
+        bookmark = Bookmark.objects.first()
+        response = self.client.get(f'/api/bookmarks/{bookmark.pk}/', {'format': 'columnar'})
+        self.assertEqual(response.json()['id'], bookmark.pk)
+
+    @unittest.skipIf(renderers.msgpack is None, 'msgpack 미설치')
+    def test_msgpack_round_trip_matches_json(self):
+        plain = self.client.get('/api/bookmarks/').json()
+        response = self.client.get('/api/bookmarks/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(renderers.msgpack.unpackb(response.content), plain)
+
+    def test_gzip_when_client_accepts_it(self):
+        response = self.client.get('/api/bookmarks/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+
+class RedirectHandler(http.server.BaseHTTPRequestHandler):
+    """/ → Location 헤더로 리다이렉트, /page → HTML"""
+    location = None
+
+    def do_GET(self):
+        if self.path == '/page':
+            body = b'<html>ok</html>'
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_response(302)
+            self.send_header('Location', self.location)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class SnapshotTests(IsolatedTestCase):
+    # 테스트용 "공개" 주소 (실제로는 로컬 서버로 연결)
+    PUBLIC_ADDRESS = '93.184.216.34'
+
+    def setUp(self):
+        super().setUp()
+        self._patch(snapshots, 'pack_writer', snapshots.PackWriter(f'{self.tmp}/packs'))
+        self._patch(snapshots, 'pack_reader', snapshots.PackReader(f'{self.tmp}/packs'))
+        self.owner = User.objects.create_user('owner')
+
+    def test_same_content_is_stored_once(self):
+        data = b'<html>' + b'<p>hello</p>\n' * 5000 + b'</html>'
+        first = snapshots.save_snapshot(make_bookmark(self.owner), data)
+        second = snapshots.save_snapshot(make_bookmark(self.owner), data)
+
+        self.assertEqual(first.content_id, second.content_id)
+        content = PageContent.objects.get()
+        self.assertEqual(content.ref_count, 2)
+        self.assertEqual(snapshots.read_content(content), data)
+        self.assertEqual(
+            SnapshotChunk.objects.count(), len(set(content.manifest.split()))
+        )
+
+    def test_chunks_are_written_with_one_fsync_before_rows(self):
+        data = b''.join(b'<p>%d</p>\n' % n for n in range(100000))
+        # fsync 시점에 PageContent 행이 있으면 쓰기 잠금을 잡은 채 fsync 한 것
+        syncs = []
+        with mock.patch(
+            'bookmarks.snapshots.os.fsync',
+            lambda fd: syncs.append(PageContent.objects.exists()),
+        ):
+            content = snapshots.store_content(data)
+
+        self.assertGreater(len(content.manifest.split()), 10)
+        self.assertEqual(syncs, [False])
+        self.assertEqual(snapshots.read_content(content), data)
+
+    def test_content_and_chunks_are_released_with_last_snapshot(self):
+        data = b'<html>' + b'x' * 10000 + b'</html>'
+        bookmarks = [make_bookmark(self.owner) for _ in range(2)]
+        for bookmark in bookmarks:
+            snapshots.save_snapshot(bookmark, data)
+
+        bookmarks[0].delete()
+        self.assertEqual(PageContent.objects.get().ref_count, 1)
+        bookmarks[1].delete()
+        self.assertFalse(PageContent.objects.exists())
+        self.assertFalse(SnapshotChunk.objects.exists())
+
+    def test_replacing_snapshot_releases_old_content(self):
+        bookmark = make_bookmark(self.owner)
+        snapshots.save_snapshot(bookmark, b'<html>old</html>')
+        snapshots.save_snapshot(bookmark, b'<html>new</html>')
+
+        self.assertEqual(PageContent.objects.count(), 1)
+        self.assertEqual(snapshots.read_content(Snapshot.objects.get().content), b'<html>new</html>')
+
+    def test_post_and_get_snapshot(self):
+        bookmark = make_bookmark(self.owner)
+        self.client.force_authenticate(self.owner)
+
+        response = self.client.post(
+            f'/api/bookmarks/{bookmark.pk}/snapshot/', {'content': '<p>saved</p>'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get(f'/api/bookmarks/{bookmark.pk}/snapshot/')
+        self.assertEqual(b''.join(response.streaming_content), b'<p>saved</p>')
+        self.assertEqual(response['Content-Security-Policy'], 'sandbox')
+
+    def test_non_string_content_returns_400(self):
+        bookmark = make_bookmark(self.owner)
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(
+            f'/api/bookmarks/{bookmark.pk}/snapshot/', {'content': ['a']}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    # ===== SSRF =====
+
+    def _fake_dns(self, table):
+        real_getaddrinfo = socket.getaddrinfo
+
+        def getaddrinfo(host, *args, **kwargs):
+            if host not in table:
+                return real_getaddrinfo(host, *args, **kwargs)
+            address = table[host]
+            family = socket.AF_INET6 if ':' in address else socket.AF_INET
+            return [(family, socket.SOCK_STREAM, 6, '', (address, 0))]
+        self._patch(snapshots.socket, 'getaddrinfo', getaddrinfo)
+
+    def _serve(self, location):
+        handler = type('Handler', (RedirectHandler,), {'location': location})
+        server = http.server.HTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        # 검사를 통과한 공개 주소로의 연결만 로컬 서버로 보냄
+        real_create_connection = socket.create_connection
+        self.connected = []
+
+        def create_connection(address, *args, **kwargs):
+            self.connected.append(address[0])
+            if address[0] == self.PUBLIC_ADDRESS:
+                address = server.server_address
+            return real_create_connection(address, *args, **kwargs)
+        self._patch(snapshots.socket, 'create_connection', create_connection)
+
+    def test_internal_address_is_rejected(self):
+        with self.assertRaises(snapshots.SnapshotError):
+            snapshots.fetch_page('http://127.0.0.1/')
+
+    def test_scoped_ipv6_address_is_rejected_not_crashing(self):
+        self._fake_dns({'scoped.test': 'fe80::1%eth0'})
+        with self.assertRaises(snapshots.SnapshotError):
+            snapshots.fetch_page('http://scoped.test/')
+
+    def test_redirect_to_internal_address_is_rejected(self):
+        self._fake_dns({'public.test': self.PUBLIC_ADDRESS, '169.254.169.254': '169.254.169.254'})
+        self._serve('http://169.254.169.254/latest/meta-data/')
+
+        with self.assertRaises(snapshots.SnapshotError):
+            snapshots.fetch_page('http://public.test/')
+        self.assertEqual(self.connected, [self.PUBLIC_ADDRESS])
+
+    def test_redirect_to_public_page_is_followed_on_checked_address(self):
+        self._fake_dns({'public.test': self.PUBLIC_ADDRESS})
+        self._serve('/page')
+
+        data, content_type = snapshots.fetch_page('http://public.test/')
+
+        self.assertEqual(data, b'<html>ok</html>')
+        self.assertEqual(content_type, 'text/html')
+        self.assertEqual(self.connected, [self.PUBLIC_ADDRESS, self.PUBLIC_ADDRESS])
+
+
+class AutocompleteTests(IsolatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.index = autocomplete.PrefixIndex()
+        self._patch(autocomplete, 'index', self.index)
+        self.owner = User.objects.create_user('owner')
+        self.other = User.objects.create_user('other')
+
+    def titled(self, title, minutes_ago=0, **kwargs):
+        bookmark = make_bookmark(self.owner, title=title, **kwargs)
+        created_at = timezone.now() - timedelta(minutes=minutes_ago)
+        Bookmark.objects.filter(pk=bookmark.pk).update(created_at=created_at)
+        return bookmark
+
+    def ids(self, prefix, user, limit=10):
+        return [r['id'] for r in autocomplete.search(prefix, user, limit)]
+
+    def test_private_bookmarks_only_for_owner(self):
+        public = self.titled('python tips', minutes_ago=2)
+        private = self.titled('python secrets', minutes_ago=1, is_public=False)
+
+        self.assertEqual(self.ids('pyt', self.owner), [private.pk, public.pk])
+        self.assertEqual(self.ids('pyt', self.other), [public.pk])
+
+    def test_made_private_in_another_process_is_hidden(self):
+        bookmark = self.titled('python tips')
+        self.assertEqual(self.ids('pyt', self.other), [bookmark.pk])
+
+        # 시그널 없이 (다른 프로세스에서 바뀐 것처럼)
+        Bookmark.objects.filter(pk=bookmark.pk).update(is_public=False)
+
+        self.assertEqual(self.ids('pyt', self.other), [])
+        self.assertEqual(self.ids('pyt', self.owner), [bookmark.pk])
+
+    def test_deleted_in_another_process_is_dropped_and_refilled(self):
+        kept = self.titled('python tips', minutes_ago=10)
+        gone = [self.titled(f'python {n}', minutes_ago=n) for n in range(3)]
+        self.assertEqual(self.ids('py', self.other, limit=2), [gone[0].pk, gone[1].pk])
+
+        # on_commit 시그널이 실행되지 않음 (다른 프로세스에서 지운 것처럼)
+        Bookmark.objects.filter(pk__in=[b.pk for b in gone]).delete()
+
+        self.assertEqual(self.ids('py', self.other, limit=2), [kept.pk])
+        self.assertEqual(set(self.index._docs), {kept.pk})
+
+    def test_wide_prefix_returns_newest_not_alphabetically_first(self):
+        for n in range(5):
+            self.titled(f'aaa {n}', minutes_ago=10 + n)
+        newest = self.titled('azz', minutes_ago=0)
+        for n in range(5):
+            self.titled(f'abcd {n}', minutes_ago=20 + n)
+        newest_abc = self.titled('abcz', minutes_ago=5)
+
+        with mock.patch.object(autocomplete, 'AUTOCOMPLETE_SCAN_LIMIT', 3):
+            self.assertEqual(self.ids('a', self.other, limit=1), [newest.pk])
+            self.assertEqual(self.ids('abc', self.other, limit=1), [newest_abc.pk])
+
+    def test_updates_and_deletes_are_reflected(self):
+        bookmark = self.titled('django orm')
+        self.assertEqual(self.ids('dj', self.other), [bookmark.pk])
+
+        bookmark.title = 'flask routing'
+        bookmark.save()
+        self.index.update(bookmark)
+        self.assertEqual(self.ids('dj', self.other), [])
+        self.assertEqual(self.ids('fla', self.other), [bookmark.pk])
+
+        self.index.remove(bookmark.pk)
+        self.assertEqual(self.ids('fla', self.other), [])
+
+    def test_age_heap_stays_bounded(self):
+        bookmark = self.titled('django orm')
+        self.ids('dj', self.other)
+        for _ in range(3000):
+            self.index.update(bookmark)
+        self.assertLessEqual(len(self.index._ages), 2 * len(self.index._docs) + 1000)
+
+
+class VisitTests(IsolatedTestCase):
+    def setUp(self):
+        super().setUp()
+        # 백그라운드 flush 스레드 없이 직접 flush
+        self._patch(visits.VisitBuffer, '_start', lambda buffer: None)
+        self.buffer = visits.VisitBuffer()
+        self._patch(visits, 'buffer', self.buffer)
+        self.bookmark = make_bookmark(User.objects.create_user('owner'))
+
+    def test_visits_are_buffered_then_flushed(self):
+        for _ in range(2):
+            response = self.client.post(f'/api/bookmarks/{self.bookmark.pk}/visit/')
+            self.assertEqual(response.status_code, 202)
+        self.assertFalse(BookmarkStats.objects.exists())
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(BookmarkStats.objects.get().visit_count, 2)
+
+    def test_out_of_range_id_is_rejected(self):
+        response = self.client.post('/api/bookmarks/99999999999999999999999/visit/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_failed_batch_is_dropped_but_locked_db_is_retried(self):
+        self.buffer.record(self.bookmark.pk)
+        with mock.patch.object(visits, 'apply_visits', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                self.buffer.flush()
+        self.assertEqual(self.buffer.flush(), 0)
+
+        self.buffer.record(self.bookmark.pk)
+        with mock.patch.object(visits, 'apply_visits', side_effect=OperationalError):
+            with self.assertRaises(OperationalError):
+                self.buffer.flush()
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(BookmarkStats.objects.get().visit_count, 1)
+
+    def test_recent_visits_rank_higher(self):
+        recent = make_bookmark(self.bookmark.owner)
+        # 반감기 3번 전의 방문 3번 < 지금 방문 1번
+        visits.apply_visits(
+            {self.bookmark.pk: 3}, now=timezone.now() - 3 * timedelta(seconds=visits.VISIT_HALF_LIFE)
+        )
+        visits.apply_visits({recent.pk: 1})
+
+        response = self.client.get('/api/bookmarks/popular/')
+        self.assertEqual([item['id'] for item in response.json()], [recent.pk, self.bookmark.pk])
+
+
+class CollectionTreeTests(IsolatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.create_user('owner')
+        self.a = collection_tree.create_collection(self.owner, 'a')
+        self.b = collection_tree.create_collection(self.owner, 'b', self.a)
+        self.c = collection_tree.create_collection(self.owner, 'c', self.b)
+        self.in_b = make_bookmark(self.owner, collection=self.b)
+        self.in_c = make_bookmark(self.owner, collection=self.c)
+
+    def counts(self, collection):
+        collection.refresh_from_db()
+        return collection.bookmark_count, collection.total_count
+
+    def test_subtree_bookmarks_and_counts(self):
+        self.assertEqual(
+            set(collection_tree.subtree_bookmarks(self.a)), {self.in_b, self.in_c}
+        )
+        self.assertEqual(self.counts(self.a), (0, 2))
+        self.assertEqual(self.counts(self.b), (1, 2))
+        self.assertEqual(self.counts(self.c), (1, 1))
+
+    def test_move_subtree_updates_paths_and_counts(self):
+        d = collection_tree.create_collection(self.owner, 'd')
+        collection_tree.move_collection(self.b, d)
+
+        self.b.refresh_from_db()
+        self.c.refresh_from_db()
+        self.assertTrue(self.c.path.startswith(d.path))
+        self.assertEqual((self.b.depth, self.c.depth), (1, 2))
+        self.assertEqual(self.counts(self.a), (0, 0))
+        self.assertEqual(self.counts(d), (0, 2))
+        self.assertEqual(set(collection_tree.subtree_bookmarks(d)), {self.in_b, self.in_c})
+
+    def test_moving_bookmark_between_collections(self):
+        self.in_c.collection = self.a
+        self.in_c.save()
+        self.assertEqual(self.counts(self.a), (1, 2))
+        self.assertEqual(self.counts(self.c), (0, 0))
+
+        self.in_c.delete()
+        self.assertEqual(self.counts(self.a), (0, 1))
+
+    def test_cannot_move_into_own_subtree(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.post(
+            f'/api/collections/{self.a.pk}/move/', {'parent': self.c.pk}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_move_rejects_bad_parent_input(self):
+        stranger = Collection.objects.create(
+            owner=User.objects.create_user('stranger'), name='theirs', path='zz', depth=0
+        )
+        self.client.force_authenticate(self.owner)
+        url = f'/api/collections/{self.c.pk}/move/'
+        for body in ({'parent': 'abc'}, {'parent': stranger.pk}, ['x']):
+            response = self.client.post(url, body, format='json')
+            self.assertEqual(response.status_code, 400, body)
+
+        response = self.client.post(url, {'parent': None}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['depth'], 0)
+
+    def test_delete_keeps_bookmarks(self):
+        collection_tree.delete_collection(self.b)
+
+        self.assertFalse(Collection.objects.filter(pk__in=[self.b.pk, self.c.pk]).exists())
+        self.assertEqual(Bookmark.objects.filter(collection__isnull=True).count(), 2)
+        self.assertEqual(self.counts(self.a), (0, 0))
+
+    def test_rebuild_counts_matches_incremental_counts(self):
+        before = list(Collection.objects.order_by('pk').values_list('bookmark_count', 'total_count'))
+        Collection.objects.update(bookmark_count=0, total_count=0)
+        collection_tree.rebuild_counts(self.owner)
+        after = list(Collection.objects.order_by('pk').values_list('bookmark_count', 'total_count'))
+        self.assertEqual(before, after)
+
+    def test_api_lists_subtree_bookmarks(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.get(f'/api/collections/{self.b.pk}/bookmarks/')
+        self.assertEqual(
+            {item['id'] for item in response.json()['results']}, {self.in_b.pk, self.in_c.pk}
+        )
+
+
+# 비밀번호 해시는 테스트와 무관하므로 빠른 해시로
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AccountPurgeTests(IsolatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self._patch(purge, 'ACCOUNT_PURGE_PAUSE', 0)
+        self.user = User.objects.create_user('leaving', password='pw')
+        self.bookmarks = [make_bookmark(self.user) for _ in range(5)]
+        self.follower = User.objects.create_user('follower')
+        Follow.objects.create(follower=self.follower, followee=self.user)
+        for bookmark in self.bookmarks:
+            feed.fan_out_bookmark(bookmark.pk)
+
+    def test_delete_account_hides_bookmarks_then_worker_purges(self):
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/delete_account/', {'password': 'pw'})
+        self.assertEqual(response.status_code, 202)
+
+        # 삭제 전에도 바로 안 보임
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(self.client.get('/api/bookmarks/public_bookmarks/').json(), [])
+        self.assertFalse(FeedEntry.objects.exists())
+        self.assertEqual(self.queue.metrics()['queued_by_name'], {'accounts.purge': 1})
+
+        self.run_queue()
+
+        account_purge = AccountPurge.objects.get()
+        self.assertEqual(account_purge.status, AccountPurge.STATUS_DONE)
+        self.assertEqual((account_purge.deleted, account_purge.total), (5, 5))
+        self.assertFalse(User.objects.filter(username='leaving').exists())
+        self.assertFalse(Bookmark.objects.exists())
+
+    def test_wrong_password_keeps_account(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/auth/delete_account/', {'password': 'nope'})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(User.objects.get(pk=self.user.pk).is_active)
+
+    def test_progress_counts_only_rows_actually_deleted(self):
+        account_purge = purge.request_purge(self.user)
+        # 다른 곳에서 먼저 지워진 북마크
+        Bookmark.objects.filter(pk__in=[b.pk for b in self.bookmarks[:2]]).delete()
+
+        account_purge = purge.run_purge(account_purge.pk, batch_size=2)
+
+        self.assertEqual(account_purge.status, AccountPurge.STATUS_DONE)
+        self.assertEqual((account_purge.deleted, account_purge.total), (3, 5))
+
+    def test_batches_report_deleted_rows(self):
+        deleted = list(purge._delete_in_batches(Bookmark.objects.filter(owner=self.user), 2))
+        self.assertEqual(deleted, [2, 2, 1])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ThrottleAndQuotaTests(IsolatedTestCase):
+    def test_token_bucket_refills_over_time(self):
+        store = self.throttle_store
+        self.assertTrue(store.consume('k', 2, 1.0, now=100)[0])
+        self.assertTrue(store.consume('k', 2, 1.0, now=100)[0])
+        self.assertFalse(store.consume('k', 2, 1.0, now=100)[0])
+        self.assertTrue(store.consume('k', 2, 1.0, now=101)[0])
+
+    def test_register_is_limited_per_ip_with_retry_after(self):
+        for _ in range(5):
+            self.assertEqual(self.client.post('/api/auth/register/', {}).status_code, 400)
+        response = self.client.post('/api/auth/register/', {})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+    def test_forwarded_for_header_does_not_change_ip(self):
+        for n in range(5):
+            self.client.post('/api/auth/register/', {}, HTTP_X_FORWARDED_FOR=f'10.0.0.{n}')
+        response = self.client.post('/api/auth/register/', {}, HTTP_X_FORWARDED_FOR='10.0.0.99')
+        self.assertEqual(response.status_code, 429)
+
+    def test_login_is_limited_per_username_across_ips(self):
+        for n in range(5):
+            self.client.post(
+                '/api/token/', {'username': 'victim', 'password': 'x'}, REMOTE_ADDR=f'10.0.0.{n}'
+            )
+        response = self.client.post(
+            '/api/token/', {'username': 'Victim', 'password': 'x'}, REMOTE_ADDR='10.0.0.99'
+        )
+        self.assertEqual(response.status_code, 429)
+
+    def test_login_with_array_body_returns_400(self):
+        response = self.client.post('/api/token/', [], format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_bookmark_quota(self):
+        owner = User.objects.create_user('owner')
+        self.client.force_authenticate(owner)
+
+        def create():
+            n = next(_urls)
+            return self.client.post('/api/bookmarks/', {
+                'title': f'bookmark {n}', 'url': f'https://example.com/{n}',
+                'description': '설명', 'is_public': False,
+            }, format='json')
+
+        with mock.patch.object(quotas, 'BOOKMARK_QUOTA', 2):
+            self.assertEqual(create().status_code, 201)
+            self.assertEqual(create().status_code, 201)
+            response = create()
+            self.assertEqual(response.status_code, 403)
+            self.assertEqual(response.json()['detail'], '북마크는 2개까지 저장할 수 있습니다.')
+
+            Bookmark.objects.filter(owner=owner).first().delete()
+            self.assertEqual(create().status_code, 201)
+
+            owner.is_staff = True
+            owner.save()
+            self.assertEqual(create().status_code, 201)
+
+
+class BookmarkAdminTests(IsolatedTestCase):
+    changelist = '/admin/bookmarks/bookmark/'
+
+    def setUp(self):
+        super().setUp()
+        self._patch(snapshots, 'pack_writer', snapshots.PackWriter(f'{self.tmp}/packs'))
+        self._patch(snapshots, 'pack_reader', snapshots.PackReader(f'{self.tmp}/packs'))
+        self.admin = User.objects.create_superuser('admin')
+        self.client.force_login(self.admin)
+
+        self.owner = User.objects.create_user('owner')
+        quotas.ensure_counter(self.owner)
+        self.collection = collection_tree.create_collection(self.owner, 'folder')
+        self.follower = User.objects.create_user('follower')
+        Follow.objects.create(follower=self.follower, followee=self.owner)
+        self.bookmarks = [make_bookmark(self.owner, collection=self.collection) for _ in range(3)]
+        for bookmark in self.bookmarks:
+            feed.fan_out_bookmark(bookmark.pk)
+
+    def action(self, name, bookmarks, **extra):
+        return self.client.post(self.changelist, {
+            'action': name,
+            ACTION_CHECKBOX_NAME: [b.pk for b in bookmarks],
+            **extra,
+        })
+
+    def test_changelist_links_next_page_by_id(self):
+        for _ in range(100):
+            make_bookmark(self.owner)
+        response = self.client.get(self.changelist)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('id__lt=', response.context_data['keyset_next_url'])
+
+    def test_make_private_then_public(self):
+        self.action('make_private', self.bookmarks[:2])
+
+        self.assertEqual(Bookmark.objects.filter(is_public=False).count(), 2)
+        self.assertEqual(FeedEntry.objects.count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.action('make_public', self.bookmarks[:2])
+        self.run_queue()
+        self.assertEqual(FeedEntry.objects.count(), 3)
+
+    def test_delete_asks_for_confirmation_then_cleans_up(self):
+        snapshots.save_snapshot(self.bookmarks[0], b'<html>x</html>')
+        BookmarkStats.objects.create(bookmark=self.bookmarks[0], visit_count=1, score=0)
+
+        response = self.action('delete_bookmarks', self.bookmarks[:2])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Bookmark.objects.count(), 3)
+
+        self.action('delete_bookmarks', self.bookmarks[:2], post='yes')
+
+        self.assertEqual(list(Bookmark.objects.all()), [self.bookmarks[2]])
+        self.assertEqual(FeedEntry.objects.count(), 1)
+        self.assertFalse(Snapshot.objects.exists())
+        self.assertFalse(PageContent.objects.exists())
+        self.assertFalse(BookmarkStats.objects.exists())
+        self.assertEqual(BookmarkQuota.objects.get(user=self.owner).bookmark_count, 1)
+        self.collection.refresh_from_db()
+        self.assertEqual((self.collection.bookmark_count, self.collection.total_count), (1, 1))
+
+    def test_delete_refuses_unknown_relations(self):
+        with mock.patch.object(bulk, 'HANDLED_RELATIONS', {FeedEntry, Snapshot}):
+            with self.assertRaises(RuntimeError):
+                bulk.delete(Bookmark.objects.all())
+        self.assertEqual(Bookmark.objects.count(), 3)
+
+
+class TaskQueueTests(IsolatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self._patch(taskqueue, 'registry', dict(taskqueue.registry))
+        self.calls = []
+
+        @taskqueue.task('test.single', max_retries=2, backoff=0.001)
+        def single(value):
+            self.calls.append(('single', value))
+            if value == 'boom':
+                raise RuntimeError('boom')
+
+        @taskqueue.task('test.batch', batch=True, batch_size=10)
+        def batch(calls):
+            self.calls.append(('batch', [args[0] for args, _ in calls]))
+
+    def job(self, job_id):
+        return self.queue._connection().execute(
+            'SELECT * FROM jobs WHERE id = ?', (job_id,)
+        ).fetchone()
+
+    def age(self, job_id, seconds):
+        """실행 중인 작업의 heartbeat가 seconds초 전에 끊긴 것처럼"""
+        past = time.time() - seconds
+        self.queue._connection().execute(
+            'UPDATE jobs SET started_at = ?, heartbeat_at = ? WHERE id = ?', (past, past, job_id)
+        )
+
+    def test_dedup_key_only_blocks_while_queued(self):
+        first = self.queue.enqueue('test.single', ['a'], dedup_key='k')
+        self.assertIsNone(self.queue.enqueue('test.single', ['a'], dedup_key='k'))
+
+        self.queue.claim('w')
+        self.assertIsNotNone(self.queue.enqueue('test.single', ['a'], dedup_key='k'))
+        self.assertEqual(self.job(first)['status'], taskqueue.STATUS_RUNNING)
+
+    def test_higher_priority_runs_first(self):
+        self.queue.enqueue('test.single', ['low'], priority=0)
+        self.queue.enqueue('test.single', ['high'], priority=5)
+        self.run_queue()
+        self.assertEqual(self.calls, [('single', 'high'), ('single', 'low')])
+
+    def test_similar_jobs_are_batched(self):
+        for n in range(15):
+            self.queue.enqueue('test.batch', [n])
+        self.assertEqual(self.run_queue(), 15)
+        self.assertEqual(self.calls, [('batch', list(range(10))), ('batch', list(range(10, 15)))])
+
+    def test_retries_with_backoff_then_fails(self):
+        job_id = self.queue.enqueue('test.single', ['boom'])
+
+        before = time.time()
+        taskqueue.run_once('w')
+        job = self.job(job_id)
+        self.assertEqual((job['status'], job['attempts']), (taskqueue.STATUS_QUEUED, 1))
+        self.assertGreater(job['run_at'], before)
+        self.assertIn('RuntimeError', job['error'])
+
+        for _ in range(10):
+            time.sleep(0.01)
+            taskqueue.run_once('w')
+        job = self.job(job_id)
+        self.assertEqual((job['status'], job['attempts']), (taskqueue.STATUS_FAILED, 3))
+        self.assertEqual(self.calls.count(('single', 'boom')), 3)
+        self.assertEqual(self.queue.metrics()['depth']['failed'], 1)
+
+    def test_stale_job_is_requeued(self):
+        job_id = self.queue.enqueue('test.single', ['a'])
+        self.queue.claim('dead-worker')
+        self.age(job_id, taskqueue.TASKQUEUE_VISIBILITY_TIMEOUT + 1)
+
+        self.assertEqual(self.run_queue(), 1)
+        self.assertEqual(self.job(job_id)['status'], taskqueue.STATUS_DONE)
+        self.assertEqual(self.calls, [('single', 'a')])
+
+    def test_stale_job_with_queued_twin_does_not_block_queue(self):
+        old = self.queue.enqueue('test.single', ['old'], dedup_key='k')
+        self.queue.claim('dead-worker')
+        new = self.queue.enqueue('test.single', ['new'], dedup_key='k')
+        self.age(old, taskqueue.TASKQUEUE_VISIBILITY_TIMEOUT + 1)
+
+        self.assertEqual(self.run_queue(), 1)
+        self.assertEqual(self.calls, [('single', 'new')])
+        self.assertEqual(self.job(old)['status'], taskqueue.STATUS_DONE)
+        self.assertEqual(self.job(new)['status'], taskqueue.STATUS_DONE)
+
+    def test_heartbeat_keeps_long_job_from_being_requeued(self):
+        job_id = self.queue.enqueue('test.single', ['a'])
+        self.queue.claim('w')
+        self.age(job_id, taskqueue.TASKQUEUE_VISIBILITY_TIMEOUT - 1)
+
+        with taskqueue.Heartbeat([job_id], interval=0.01):
+            time.sleep(0.1)
+
+        self.assertEqual(self.queue.claim('other'), [])
+        self.assertEqual(self.job(job_id)['status'], taskqueue.STATUS_RUNNING)
+
+    def test_metrics_report_depth_and_latency(self):
+        self.queue.enqueue('test.single', ['a'])
+        self.queue.enqueue('test.batch', [1])
+        self.queue.enqueue('test.batch', [2], countdown=60)
+        metrics = self.queue.metrics()
+        self.assertEqual(metrics['depth']['queued'], 3)
+        self.assertEqual(metrics['queued_by_name'], {'test.single': 1, 'test.batch': 2})
+
+        self.run_queue()
+        metrics = self.queue.metrics()
+        self.assertEqual(metrics['depth']['done'], 2)
+        self.assertEqual(metrics['completed'], 2)
+        self.assertIsNotNone(metrics['wait_p95'])
+
+    def test_run_worker_once_drains_queue(self):
+        for n in range(3):
+            self.queue.enqueue('test.single', [n])
+        call_command('run_worker', once=True, stdout=io.StringIO())
+        self.assertEqual(len(self.calls), 3)
+
+
+class FeedSyncTests(IsolatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = User.objects.create_user('author')
+        self.reader = User.objects.create_user('reader')
+        Follow.objects.create(follower=self.reader, followee=self.author)
+        self.bookmark = make_bookmark(self.author)
+        self.client.force_authenticate(self.author)
+
+    def toggle(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/bookmarks/{self.bookmark.pk}/toggle_public/')
+
+    def test_public_private_public_ends_in_feed(self):
+        for _ in range(3):
+            self.toggle()
+        self.assertEqual(self.queue.metrics()['queued_by_name'], {'feed.sync': 1})
+
+        self.run_queue()
+
+        self.bookmark.refresh_from_db()
+        self.assertFalse(self.bookmark.is_public)
+        self.toggle()
+        self.run_queue()
+        self.assertTrue(FeedEntry.objects.filter(user=self.reader, bookmark=self.bookmark).exists())
+
+    def test_removal_skips_bookmark_that_is_public_again(self):
+        feed.fan_out_bookmark(self.bookmark.pk)
+        # 제거 작업이 실행되기 전에 다시 공개된 경우
+        self.assertEqual(feed.remove_bookmark_from_feeds(self.bookmark.pk), 0)
+        self.assertTrue(FeedEntry.objects.filter(bookmark=self.bookmark).exists())
+
+    def test_logout_schedules_one_token_cleanup(self):
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                refresh = str(RefreshToken.for_user(self.author))
+                self.client.post('/api/auth/logout/', {'refresh': refresh})
+        self.assertEqual(
+            self.queue.metrics()['queued_by_name'], {'auth.flush_expired_tokens': 1}
+        )
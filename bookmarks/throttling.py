@@ -0,0 +1,144 @@
+# bookmarks/throttling.py
+"""
+토큰 버킷 요청 제한 (워커 프로세스끼리 상태 공유)
+
+실무 팁:
+- DRF 기본 throttle은 Django 캐시(기본값 LocMemCache)를 씀
+  → 프로세스마다 카운터가 따로라서 워커 4개면 제한도 4배
+- 여기서는 별도 SQLite 파일(RATELIMIT_DB_PATH) 하나를 모든 프로세스가 공유
+  (메인 DB와 분리 → 북마크 쓰기 잠금과 경쟁하지 않음)
+- 버킷 갱신은 UPSERT 한 문장 → 프로세스가 동시에 와도 원자적
+
+속도 형식은 DRF와 같음: DEFAULT_THROTTLE_RATES = {'scope': '10/min'}
+→ 버킷 크기 10, 초당 10/60개씩 다시 참
+"""
+import random
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+RATELIMIT_DB_PATH = getattr(settings, 'RATELIMIT_DB_PATH', settings.BASE_DIR / 'ratelimit.sqlite3')
+# 이 시간(초) 동안 안 쓰인 버킷은 지움
+RATELIMIT_BUCKET_TTL = 24 * 60 * 60
+
+CONSUME_SQL = '''
+INSERT INTO buckets (key, tokens, updated, allowed)
+VALUES (:key, :capacity - 1, :now, 1)
+ON CONFLICT (key) DO UPDATE SET
+    tokens = MIN(:capacity, tokens + (:now - updated) * :refill)
+             - (MIN(:capacity, tokens + (:now - updated) * :refill) >= 1),
+    allowed = MIN(:capacity, tokens + (:now - updated) * :refill) >= 1,
+    updated = :now
+RETURNING tokens, allowed
+'''
+
+
+class TokenBucketStore:
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                'updated REAL NOT NULL, allowed INTEGER NOT NULL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    def consume(self, key, capacity, refill, now=None):
+        """
+        토큰 하나 사용 시도
+
+        반환: (허용 여부, 남은 토큰)
+        """
+        now = time.time() if now is None else now
+        conn = self._connection()
+        tokens, allowed = conn.execute(CONSUME_SQL, {
+            'key': key, 'capacity': capacity, 'refill': refill, 'now': now,
+        }).fetchone()
+        if random.random() < 0.001:
+            conn.execute('DELETE FROM buckets WHERE updated < ?', (now - RATELIMIT_BUCKET_TTL,))
+        return bool(allowed), tokens
+
+
+store = TokenBucketStore(RATELIMIT_DB_PATH)
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle과 설정/키 형식은 같고 저장소만 공유 SQLite 토큰 버킷
+
+    wait()이 다음 토큰까지 남은 시간을 돌려주므로
+    DRF가 429 응답에 Retry-After 헤더를 붙여줌
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.refill = self.num_requests / self.duration
+        allowed, self.tokens = store.consume(self.key, self.num_requests, self.refill)
+        return allowed
+
+    def wait(self):
+        return max(0.0, (1 - self.tokens) / self.refill)
+
+    def get_cache_key(self, request, view):
+        """로그인 사용자는 사용자별, 아니면 IP별"""
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class RegisterThrottle(TokenBucketThrottle):
+    """회원가입 (PBKDF2 해시) - IP별"""
+    scope = 'register'
+
+
+class LoginThrottle(TokenBucketThrottle):
+    """로그인 (비밀번호 확인) - IP별"""
+    scope = 'login'
+
+
+class LoginUsernameThrottle(TokenBucketThrottle):
+    """
+    로그인 - 계정별
+    IP를 바꿔가며 한 계정을 공격하는 경우 대비
+    """
+    scope = 'login_username'
+
+    def get_cache_key(self, request, view):
+        data = getattr(request, 'data', None)
+        # JSON 배열 등 dict가 아닌 본문 → 뷰에서 400 처리
+        if not hasattr(data, 'get'):
+            return None
+        username = data.get('username')
+        if not username:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': str(username).lower()}
+
+
+class BookmarkWriteThrottle(TokenBucketThrottle):
+    """북마크 생성/수정/삭제 - 사용자별"""
+    scope = 'bookmark_write'
+
+
+class VisitThrottle(TokenBucketThrottle):
+    """방문 기록 - 사용자/IP별"""
+    scope = 'visit'
@@ -1,14 +1,20 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BookmarkViewSet, AuthViewSet
+from .views import BookmarkViewSet, AuthViewSet, CollectionViewSet, UserViewSet, bookmark_stream
 
 router = DefaultRouter()
 router.register('bookmarks', BookmarkViewSet)
+router.register('collections', CollectionViewSet, basename='collection')
 
 # 인증 API
 router.register('auth', AuthViewSet, basename='auth')
 
+# 팔로우 API
+router.register('users', UserViewSet)
+
 urlpatterns = [
+    # SSE 스트림 (async 뷰) - router의 bookmarks/{pk}/ 보다 먼저 와야 함
+    path('bookmarks/stream/', bookmark_stream, name='bookmark-stream'),
     path('', include(router.urls)),
 ]
 
@@ -2,10 +2,34 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated,IsAuthenticatedOrReadOnly
-from .models import Bookmark
-from .serializers import BookmarkSerializer, UserSerializer, RegisterSerializer
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.views import TokenObtainPairView
+from django.db import transaction
+from rest_framework.permissions import IsAuthenticated,IsAuthenticatedOrReadOnly,AllowAny
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.settings import api_settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from .models import Bookmark, BookmarkStats, Collection, Follow, Snapshot
+from .serializers import (
+    BookmarkSerializer, CollectionSerializer, CollectionMoveSerializer,
+    UserSerializer, RegisterSerializer
+)
 from .permissions import IsOwnerOrReadOnly
+from . import feed as home_feed
+from . import events
+from . import snapshots
+from . import autocomplete as autocomplete_index
+from . import visits
+from . import collection_tree
+from . import purge
+from . import tasks
+from . import quotas
+from .throttling import (
+    BookmarkWriteThrottle, LoginThrottle, LoginUsernameThrottle,
+    RegisterThrottle, VisitThrottle,
+)
+from .renderers import bookmark_renderer_classes
 
 class BookmarkViewSet(viewsets.ModelViewSet):
     """
@@ -24,10 +48,17 @@ class BookmarkViewSet(viewsets.ModelViewSet):
     - my_bookmarks: 내 북마크
     - public_bookmarks: 공개 북마크
     - toggle_public: 공개/비공개 토글
+    - feed: 팔로우한 사용자의 공개 북마크 피드
+    - snapshot: 페이지 스냅샷 저장/조회
+    - autocomplete: 제목/도메인 접두어 자동완성
+    - visit: 방문 기록
+    - popular: 인기 북마크 (최근 방문일수록 가중치 큼)
     """
     queryset = Bookmark.objects.select_related('owner').all()
     serializer_class = BookmarkSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
+    # JSON(기본) + 컬럼 방식 JSON + MessagePack
+    renderer_classes = bookmark_renderer_classes(api_settings.DEFAULT_RENDERER_CLASSES)
 
     def get_queryset(self):
         """
@@ -48,11 +79,35 @@ class BookmarkViewSet(viewsets.ModelViewSet):
         #         Q(owner=user) | Q(is_public=True)
         #     )
 
+    def get_throttles(self):
+        """
+        쓰기 요청만 사용자별 요청 제한 (조회는 제한 없음)
+        """
+        if self.request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            if self.action == 'visit':
+                return [VisitThrottle()]
+            return [BookmarkWriteThrottle()]
+        return super().get_throttles()
+
     def perform_create(self, serializer):
         """
         북마크 생성 시 owner를 현재 로그인한 사용자로 자동 설정
+        할당량 확인과 저장은 같은 트랜잭션에서
+        """
+        with transaction.atomic():
+            quotas.check_quota(self.request.user)
+            bookmark = serializer.save(owner=self.request.user)
+        if bookmark.is_public:
+            home_feed.enqueue_sync(bookmark)
+
+    def perform_update(self, serializer):
         """
-        serializer.save(owner=self.request.user)
+        PUT/PATCH로 공개 여부가 바뀌면 피드에도 반영
+        """
+        was_public = serializer.instance.is_public
+        bookmark = serializer.save()
+        if bookmark.is_public != was_public:
+            home_feed.enqueue_sync(bookmark)
 
     @action(detail=False, methods=['get'])
     def recent(self, request):
@@ -102,9 +157,273 @@ class BookmarkViewSet(viewsets.ModelViewSet):
         bookmark.is_public = not bookmark.is_public
         bookmark.save()
 
+        # 공개 → 팔로워 피드에 팬아웃, 비공개 → 피드에서 제거
+        home_feed.enqueue_sync(bookmark)
+
         serializer = self.get_serializer(bookmark)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def feed(self, request):
+        """
+        팔로우한 사용자의 공개 북마크 피드
+        URL: GET /bookmarks/feed/?cursor=<next에 들어있는 값>
+
+        OFFSET 대신 커서(keyset) 방식이라 뒤 페이지도 빠름
+        """
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                cursor = home_feed.decode_cursor(cursor)
+            except ValueError:
+                return Response(
+                    {'detail': '유효하지 않은 커서입니다.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        bookmarks, next_cursor = home_feed.get_feed_page(request.user, cursor)
+        next_url = None
+        if next_cursor:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), 'cursor', next_cursor
+            )
+
+        serializer = self.get_serializer(bookmarks, many=True)
+        return Response({
+            'next': next_url,
+            'results': serializer.data,
+        })
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        검색창 자동완성 (DB 대신 메모리 인덱스 사용)
+        URL: GET /bookmarks/autocomplete/?q=pyth&limit=10
+
+        공개 북마크 + 내 북마크 중 제목 단어나 도메인이 q로 시작하는 것, 최신순
+        """
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), 50)
+        except ValueError:
+            limit = 10
+
+        results = autocomplete_index.search(query, request.user, limit)
+        return Response(results)
+
+    @action(detail=True, methods=['post'], permission_classes=[AllowAny])
+    def visit(self, request, pk=None):
+        """
+        방문 기록
+        URL: POST /bookmarks/{id}/visit/
+
+        DB에 바로 쓰지 않고 메모리에 모았다가 주기적으로 반영 → 202
+        """
+        try:
+            bookmark_id = int(pk)
+        except (TypeError, ValueError):
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        if not 0 < bookmark_id <= visits.MAX_BOOKMARK_ID:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        visits.record_visit(bookmark_id)
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'])
+    def popular(self, request):
+        """
+        인기 북마크 10개 (공개 + 내 북마크)
+        URL: GET /bookmarks/popular/
+
+        정렬은 BookmarkStats.score 인덱스를 그대로 사용
+        """
+        from django.db.models import Q
+
+        visible = Q(bookmark__is_public=True)
+        if request.user.is_authenticated:
+            visible |= Q(bookmark__owner=request.user)
+
+        stats = (
+            BookmarkStats.objects.filter(visible)
+            .select_related('bookmark', 'bookmark__owner')
+            .order_by('-score')[:10]
+        )
+        data = []
+        for row in stats:
+            item = self.get_serializer(row.bookmark).data
+            item['visit_count'] = row.visit_count
+            data.append(item)
+        return Response(data)
+
+    @action(detail=True, methods=['get', 'post'])
+    def snapshot(self, request, pk=None):
+        """
+        페이지 스냅샷
+        URL: GET  /bookmarks/{id}/snapshot/  → 저장된 페이지 (원본 그대로)
+             POST /bookmarks/{id}/snapshot/  → 지금 페이지를 저장
+
+        POST 요청 (선택):
+        {
+            "content": "<html>...</html>"   # 없으면 서버가 URL에서 직접 가져옴
+        }
+        """
+        bookmark = self.get_object()
+
+        if request.method == 'GET':
+            # 비공개 북마크의 스냅샷은 주인만
+            if not bookmark.is_public and bookmark.owner != request.user:
+                return Response(status=status.HTTP_404_NOT_FOUND)
+            snapshot = get_object_or_404(
+                Snapshot.objects.select_related('content'), bookmark=bookmark
+            )
+            response = StreamingHttpResponse(
+                snapshots.iter_content(snapshot.content),
+                content_type=snapshot.content_type,
+            )
+            # 저장된 페이지의 스크립트가 우리 도메인에서 실행되지 않도록
+            response['Content-Security-Policy'] = 'sandbox'
+            response['Content-Length'] = snapshot.content.size
+            return response
+
+        # 자신의 북마크만 저장 가능
+        if bookmark.owner != request.user:
+            return Response(
+                {'error': '자신의 북마크만 저장할 수 있습니다.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        content = request.data.get('content') if hasattr(request.data, 'get') else None
+        if content is not None and not isinstance(content, str):
+            return Response(
+                {'content': ['문자열이어야 합니다.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            if content:
+                data, content_type = content.encode(), 'text/html'
+            else:
+                data, content_type = snapshots.fetch_page(bookmark.url)
+            snapshot = snapshots.save_snapshot(bookmark, data, content_type)
+        except snapshots.SnapshotError as e:
+            return Response(
+                {'detail': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'bookmark': bookmark.pk,
+            'digest': snapshot.content.digest,
+            'size': snapshot.content.size,
+            'content_type': snapshot.content_type,
+            'captured_at': snapshot.captured_at,
+        }, status=status.HTTP_201_CREATED)
+
+class CollectionViewSet(viewsets.ModelViewSet):
+    """
+    폴더 ViewSet (내 폴더만)
+
+    기능:
+    - list: 내 폴더 전체 (트리 순서)
+    - create / retrieve / update(이름) / destroy(하위 폴더 포함)
+
+    커스텀 액션:
+    - bookmarks: 이 폴더와 하위 폴더의 북마크
+    - move: 다른 폴더 아래로 이동
+    """
+    serializer_class = CollectionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Collection.objects.filter(owner=self.request.user)
+
+    def perform_create(self, serializer):
+        """
+        path는 id가 생긴 뒤에 만들어야 하므로 collection_tree에서 생성
+        """
+        data = serializer.validated_data
+        try:
+            serializer.instance = collection_tree.create_collection(
+                self.request.user, data['name'], data.get('parent')
+            )
+        except collection_tree.TreeError as e:
+            raise ValidationError({'parent': str(e)})
+
+    def perform_destroy(self, instance):
+        collection_tree.delete_collection(instance)
+
+    @action(detail=True, methods=['get'])
+    def bookmarks(self, request, pk=None):
+        """
+        이 폴더와 모든 하위 폴더의 북마크
+        URL: GET /collections/{id}/bookmarks/
+        """
+        collection = self.get_object()
+        bookmarks = collection_tree.subtree_bookmarks(collection).select_related('owner')
+
+        page = self.paginate_queryset(bookmarks)
+        serializer = BookmarkSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['post'])
+    def move(self, request, pk=None):
+        """
+        폴더 이동 (하위 폴더 포함)
+        URL: POST /collections/{id}/move/
+
+        요청:
+        {
+            "parent": 3     # null이면 최상위로
+        }
+        """
+        collection = self.get_object()
+
+        move = CollectionMoveSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        move.is_valid(raise_exception=True)
+        parent = move.validated_data['parent']
+
+        try:
+            collection = collection_tree.move_collection(collection, parent)
+        except collection_tree.TreeError as e:
+            return Response(
+                {'detail': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = self.get_serializer(collection)
+        return Response(serializer.data)
+
+async def bookmark_stream(request):
+    """
+    공개 북마크 이벤트 스트림 (Server-Sent Events)
+
+    URL: GET /api/bookmarks/stream/
+    Headers: Last-Event-ID: <마지막으로 받은 id> (재연결 시 브라우저가 자동으로 보냄)
+
+    이벤트:
+    - created / updated: 북마크 전체
+    - visibility: 공개 ↔ 비공개 전환
+    - deleted: {"id": ...}
+    - reset: 놓친 이벤트가 있음 → 목록을 다시 받아야 함
+      (다른 서버 프로세스로 재연결했거나 서버가 재시작된 경우 포함)
+
+    주의: async 뷰라서 ASGI 서버(uvicorn, daphne)로 실행해야
+    연결당 스레드를 잡지 않음 (config/asgi.py 참고)
+    """
+    # 처음 접속하면(없으면) 지금 이후 이벤트만
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+
+    response = StreamingHttpResponse(
+        events.stream(last_event_id, heartbeat=events.EVENT_STREAM_HEARTBEAT),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # nginx 버퍼링 끄기
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken,TokenError
 from django.contrib.auth import get_user_model
@@ -117,7 +436,8 @@ class AuthViewSet(viewsets.GenericViewSet):
     GenericViewSet: 기본 CRUD 없이 커스텀 액션만 사용
     """
 
-    @action(detail=False, methods=['post'], permission_classes=[AllowAny])
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny],
+            throttle_classes=[RegisterThrottle])
     def register(self, request):
         """
         회원가입
@@ -226,6 +546,11 @@ class AuthViewSet(viewsets.GenericViewSet):
             token.blacklist()
             # 내부적으로 token_blacklist_blacklistedtoken 테이블에 추가됨
 
+            # 3. 만료된 토큰 기록 정리 예약 (대기 중인 정리 작업이 있으면 추가하지 않음)
+            tasks.flush_expired_tokens.delay(
+                dedup_key='flush_expired_tokens', countdown=tasks.TOKEN_FLUSH_DELAY
+            )
+
             return Response(
                 {'detail': '로그아웃되었습니다.'},
                 status=status.HTTP_200_OK
@@ -237,6 +562,109 @@ class AuthViewSet(viewsets.GenericViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def delete_account(self, request):
+        """
+        회원 탈퇴
+
+        URL: POST /api/auth/delete_account/
+        Headers: Authorization: Bearer <access_token>
+
+        요청:
+        {
+            "password": "secret123"
+        }
+
+        응답 (202):
+        {
+            "detail": "탈퇴 처리되었습니다. 데이터는 순차적으로 삭제됩니다.",
+            "purge": {"id": 1, "status": "pending", "total": 1234}
+        }
+
+        계정은 즉시 비활성화되고, 북마크는 백그라운드에서 나눠서 삭제됨
+        """
+        password = request.data.get('password')
+        if not password or not request.user.check_password(password):
+            return Response(
+                {'password': '비밀번호가 올바르지 않습니다.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        account_purge = purge.request_purge(request.user)
+
+        return Response({
+            'detail': '탈퇴 처리되었습니다. 데이터는 순차적으로 삭제됩니다.',
+            'purge': {
+                'id': account_purge.pk,
+                'status': account_purge.status,
+                'total': account_purge.total,
+            }
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class LoginView(TokenObtainPairView):
+    """
+    로그인 (토큰 발급) + 요청 제한
+
+    비밀번호 확인은 CPU를 많이 쓰므로 IP별, 계정별로 제한
+    """
+    throttle_classes = [LoginThrottle, LoginUsernameThrottle]
+
+
+class UserViewSet(viewsets.GenericViewSet):
+    """
+    사용자 팔로우 ViewSet
+
+    커스텀 액션:
+    - follow: 팔로우
+    - unfollow: 언팔로우
+    """
+    queryset = User.objects.filter(is_active=True)
+    serializer_class = UserSerializer
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=True, methods=['post'])
+    def follow(self, request, pk=None):
+        """
+        팔로우
+        URL: POST /api/users/{id}/follow/
+        """
+        followee = self.get_object()
+
+        if followee == request.user:
+            return Response(
+                {'detail': '자기 자신은 팔로우할 수 없습니다.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        _, created = Follow.objects.get_or_create(
+            follower=request.user, followee=followee
+        )
+        if created:
+            # 상대의 최근 공개 북마크로 피드 채우기
+            home_feed.backfill_follow(request.user.pk, followee.pk)
+
+        return Response(
+            {'detail': '팔로우했습니다.'},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    @action(detail=True, methods=['post'])
+    def unfollow(self, request, pk=None):
+        """
+        언팔로우
+        URL: POST /api/users/{id}/unfollow/
+        """
+        followee = self.get_object()
+
+        deleted, _ = Follow.objects.filter(
+            follower=request.user, followee=followee
+        ).delete()
+        if deleted:
+            home_feed.remove_follow(request.user.pk, followee.pk)
+
+        return Response({'detail': '언팔로우했습니다.'})
+
 
 # 로그아웃 기능을 구현
 # access token / refresh token 을 입력해서 테스트
@@ -0,0 +1,148 @@
+# bookmarks/visits.py
+"""
+방문 수 집계 (write-behind)
+
+실무 팁:
+- 클릭마다 UPDATE 하면 SQLite 쓰기 잠금을 계속 잡음
+- 프로세스 메모리에 {북마크 id: 증가량}만 모아두고
+  VISIT_FLUSH_INTERVAL초마다 한 트랜잭션으로 몰아서 반영
+- 프로세스가 죽으면 아직 반영 안 된 방문 수는 잃어버림 (통계라서 허용)
+
+인기도 점수 (BookmarkStats.score):
+- 반감기 VISIT_HALF_LIFE초인 지수 감쇠를 로그 공간에 누적
+- score = log(Σ 방문수 × exp((방문 시각 - EPOCH) / tau))
+"""
+import atexit
+import logging
+import math
+import threading
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Bookmark, BookmarkStats
+
+logger = logging.getLogger(__name__)
+
+VISIT_FLUSH_INTERVAL = getattr(settings, 'VISIT_FLUSH_INTERVAL', 5)
+VISIT_HALF_LIFE = getattr(settings, 'VISIT_HALF_LIFE', 3 * 24 * 60 * 60)
+# 이만큼 쌓이면 주기를 기다리지 않고 바로 반영
+VISIT_BUFFER_MAX_KEYS = getattr(settings, 'VISIT_BUFFER_MAX_KEYS', 10000)
+
+# BigAutoField 범위 (SQLite INTEGER에 들어가는 값만)
+MAX_BOOKMARK_ID = 2 ** 63 - 1
+
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+TAU = VISIT_HALF_LIFE / math.log(2)
+
+
+def decayed_contribution(count, when):
+    """방문 count번의 점수 기여분 (로그 공간)"""
+    return math.log(count) + (when - EPOCH).total_seconds() / TAU
+
+
+def log_add(a, b):
+    """log(exp(a) + exp(b)) - 오버플로 없이"""
+    if a < b:
+        a, b = b, a
+    return a + math.log1p(math.exp(b - a))
+
+
+class VisitBuffer:
+    def __init__(self, interval=VISIT_FLUSH_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._thread = None
+        self._wakeup = threading.Event()
+
+    def record(self, bookmark_id, count=1):
+        if not 0 < bookmark_id <= MAX_BOOKMARK_ID:
+            return
+        with self._lock:
+            self._counts[bookmark_id] = self._counts.get(bookmark_id, 0) + count
+            pending = len(self._counts)
+            if self._thread is None:
+                self._start()
+        if pending >= VISIT_BUFFER_MAX_KEYS:
+            self._wakeup.set()
+
+    def _start(self):
+        self._thread = threading.Thread(
+            target=self._run, name='visit-flusher', daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # DB가 잠시 잠겨 있어도 다음 주기에 다시 시도
+                logger.exception('방문 수 반영 실패')
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """
+        모아둔 증가량을 한 트랜잭션으로 반영
+        반환: 반영한 북마크 수
+        """
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        if not counts:
+            return 0
+        try:
+            return apply_visits(counts)
+        except OperationalError:
+            # DB가 잠시 잠긴 경우만 다음 번에 다시 반영
+            # (다른 오류는 다시 넣어도 계속 실패하므로 이번 묶음은 버림)
+            with self._lock:
+                for bookmark_id, count in counts.items():
+                    self._counts[bookmark_id] = self._counts.get(bookmark_id, 0) + count
+            raise
+
+
+def apply_visits(counts, now=None):
+    now = now or timezone.now()
+    with transaction.atomic():
+        # 그 사이 삭제된 북마크, 있을 수 없는 id는 제외
+        valid = [i for i in counts if 0 < i <= MAX_BOOKMARK_ID]
+        alive = set(
+            Bookmark.objects.filter(id__in=valid).values_list('id', flat=True)
+        )
+        stats = BookmarkStats.objects.in_bulk(alive)
+
+        changed, created = [], []
+        for bookmark_id in alive:
+            count = counts[bookmark_id]
+            contribution = decayed_contribution(count, now)
+            row = stats.get(bookmark_id)
+            if row is None:
+                created.append(BookmarkStats(
+                    bookmark_id=bookmark_id, visit_count=count,
+                    score=contribution, last_visited_at=now,
+                ))
+            else:
+                row.visit_count += count
+                row.score = log_add(row.score, contribution)
+                row.last_visited_at = now
+                changed.append(row)
+
+        BookmarkStats.objects.bulk_create(created, batch_size=500)
+        BookmarkStats.objects.bulk_update(
+            changed, ['visit_count', 'score', 'last_visited_at'], batch_size=500
+        )
+    return len(alive)
+
+
+buffer = VisitBuffer()
+
+
+def record_visit(bookmark_id):
+    buffer.record(bookmark_id)
@@ -5,6 +5,18 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+The bookmark event stream (``/api/bookmarks/stream/``) is an async view, so
+serve this application with an ASGI server to keep idle SSE connections on
+the event loop instead of one thread each, e.g.::
+
+    uvicorn config.asgi:application --workers 4
+
+Each worker process has its own event broker (bookmarks/events.py): a client
+only receives events published in the process it is connected to, and a
+reconnect that lands on another worker (or on a restarted one) gets a
+``reset`` event instead of a replay. Deletes done by the task queue worker
+(``manage.py run_worker``, e.g. account purges) are not streamed at all.
 """
 
 import os
@@ -47,6 +47,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Accept-Encoding: gzip 이면 응답 압축 (큰 목록 응답 크기 감소, SSE 스트림은 제외)
+    'bookmarks.middleware.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -70,7 +72,77 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+
+    # 요청 제한 (bookmarks/throttling.py - 토큰 버킷)
+    # '10/min' → 최대 10번 연속, 이후 6초마다 1번씩 회복
+    'DEFAULT_THROTTLE_RATES': {
+        'register': '5/hour',        # 회원가입 (IP별)
+        'login': '20/min',           # 로그인 (IP별)
+        'login_username': '5/min',   # 로그인 (계정별)
+        'bookmark_write': '60/min',  # 북마크 생성/수정/삭제 (사용자별)
+        'visit': '120/min',          # 방문 기록 (사용자/IP별)
+    },
+    # IP별 제한에 쓸 클라이언트 IP: 앞단 프록시 수
+    # 0 → REMOTE_ADDR만 사용 (클라이언트가 보낸 X-Forwarded-For는 무시)
+    # nginx 하나 뒤에서 돌리면 1
+    'NUM_PROXIES': 0,
 }
+# 요청 제한 상태를 모든 워커 프로세스가 공유하는 SQLite 파일
+RATELIMIT_DB_PATH = BASE_DIR / 'ratelimit.sqlite3'
+# 사용자당 북마크 최대 개수 (관리자는 제한 없음)
+BOOKMARK_QUOTA = 10000
+
+
+# 홈 피드 설정 (bookmarks/feed.py)
+# 사용자당 피드에 남겨둘 최대 항목 수
+FEED_MAX_LENGTH = 1000
+# 팔로워가 이보다 많으면 쓰기 시 팬아웃하지 않고 읽을 때 합침
+FEED_FANOUT_MAX_FOLLOWERS = 5000
+FEED_PAGE_SIZE = 20
+
+# 북마크 이벤트 스트림 설정 (bookmarks/events.py)
+# Last-Event-ID로 이어받을 수 있는 최근 이벤트 수
+EVENT_REPLAY_BUFFER_SIZE = 1000
+# 이벤트가 없을 때 keep-alive 주석을 보내는 간격(초)
+EVENT_STREAM_HEARTBEAT = 15
+
+# 페이지 스냅샷 저장소 (bookmarks/snapshots.py)
+# 팩 파일 위치 (git에 올리지 않음)
+SNAPSHOT_ROOT = BASE_DIR / 'snapshots'
+# 저장할 수 있는 페이지 최대 크기
+SNAPSHOT_MAX_BYTES = 5 * 1024 * 1024
+# 팩 파일 하나의 최대 크기
+SNAPSHOT_PACK_MAX_BYTES = 64 * 1024 * 1024
+
+# 자동완성 메모리 인덱스 (bookmarks/autocomplete.py)
+# 프로세스당 인덱스에 올려둘 최대 북마크 수 (오래된 것부터 제외)
+AUTOCOMPLETE_MAX_DOCS = 100000
+# 다른 프로세스의 변경분을 가져오는 주기(초)
+AUTOCOMPLETE_REFRESH_SECONDS = 30
+
+# 방문 수 집계 (bookmarks/visits.py)
+# 메모리에 모은 방문 수를 DB에 반영하는 주기(초)
+VISIT_FLUSH_INTERVAL = 5
+# 인기도 점수 반감기(초) - 3일 전 방문은 지금 방문의 절반 가치
+VISIT_HALF_LIFE = 3 * 24 * 60 * 60
+
+# 탈퇴 계정 데이터 삭제 (bookmarks/purge.py)
+# 한 트랜잭션에서 지울 북마크 수 (작을수록 쓰기 잠금을 짧게 잡음)
+ACCOUNT_PURGE_BATCH_SIZE = 200
+# 배치 사이 쉬는 시간(초)
+ACCOUNT_PURGE_PAUSE = 0.05
+
+# 작업 큐 (bookmarks/taskqueue.py)
+# 워커 실행: python manage.py run_worker --processes 4
+# 큐 파일 위치 (git에 올리지 않음)
+TASKQUEUE_DB_PATH = BASE_DIR / 'tasks.sqlite3'
+# True면 큐에 넣지 않고 커밋 직후 요청 안에서 바로 실행 (워커 없이 개발할 때)
+TASKQUEUE_ALWAYS_EAGER = False
+# 실행 중 작업의 heartbeat가 이 시간(초) 넘게 끊기면 워커가 죽은 것으로 보고 다시 실행
+TASKQUEUE_VISIBILITY_TIMEOUT = 300
+# 로그아웃 후 만료 토큰 정리까지 기다리는 시간(초)
+TOKEN_FLUSH_DELAY = 60 * 60
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -17,10 +17,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import (
-    TokenObtainPairView,      # 로그인 (토큰 발급)
     TokenRefreshView,         # 토큰 갱신
     TokenVerifyView,          # 토큰 검증
 )
+from bookmarks.views import LoginView  # 로그인 (토큰 발급, 요청 제한 적용)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -28,7 +28,7 @@ urlpatterns = [
     path('api/', include('bookmarks.urls')),
     # ===== JWT 인증 API =====
     # 로그인: username/password → Access + Refresh Token
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/token/', LoginView.as_view(), name='token_obtain_pair'),
 
     # 토큰 갱신: Refresh Token → 새 Access Token
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),